@@ -1,11 +1,32 @@
+import fnmatch
+import glob
+import mmap
+import os
 import re
+import shutil
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from itertools import zip_longest
 from string import Template
-from typing import List, Optional, Union
+from tempfile import NamedTemporaryFile
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
 from packaging.version import Version
 
+from commitizen import git, manifest
 from commitizen.defaults import (
     MAJOR,
     MINOR,
@@ -16,38 +37,104 @@ from commitizen.defaults import (
 )
 from commitizen.git import GitCommit
 
+if TYPE_CHECKING:
+    from commitizen.commit_cache import CommitCache
+
+INCREMENTS_ORDER = [PATCH, MINOR, MAJOR]
+
+# Version files `update_version_in_files` rewrites at once
+UPDATE_VERSION_JOBS = 8
+
+
+class IncrementClassifier:
+    """Compiled form of a `bump_pattern` and its `bump_map`.
+
+    Both are compiled once and the increment of every keyword found is
+    memoized, so classifying a line costs a single regex search.
+    """
+
+    def __init__(self, regex: str = bump_pattern, increments_map: dict = bump_map):
+        self.select_pattern = re.compile(regex)
+        self.increments_map = [
+            (re.compile(pattern), increment)
+            for pattern, increment in increments_map.items()
+        ]
+        self.highest_increment = max(
+            (i for i in increments_map.values() if i in INCREMENTS_ORDER),
+            key=INCREMENTS_ORDER.index,
+            default=None,
+        )
+        # Once reached, no later line can change the result. A PATCH is not
+        # final: `merge_increment` resets it on a keyword missing from the map.
+        self.final_increment = (
+            self.highest_increment if self.highest_increment != PATCH else None
+        )
+        self._keyword_increments: Dict[str, Optional[str]] = {}
+
+    def keyword_increment(self, keyword: str) -> Optional[str]:
+        """Return the increment of the first `bump_map` entry matching."""
+        try:
+            return self._keyword_increments[keyword]
+        except KeyError:
+            pass
+
+        increment = None
+        for pattern, map_increment in self.increments_map:
+            if pattern.match(keyword):
+                increment = map_increment
+                break
+        self._keyword_increments[keyword] = increment
+        return increment
+
+    def commit_increments(self, commit: GitCommit) -> List[Optional[str]]:
+        """Increment of every line of the commit selected by the pattern."""
+        increments = []
+        for message in commit.message.split("\n"):
+            result = self.select_pattern.search(message)
+            if result:
+                increments.append(self.keyword_increment(result.group(0)))
+        return increments
+
+
+def merge_increment(increment: Optional[str], new_increment: Optional[str]):
+    if increment == MAJOR:
+        return increment
+    elif increment == MINOR and new_increment == MAJOR:
+        return new_increment
+    elif increment == PATCH or increment is None:
+        return new_increment
+    return increment
+
 
 def find_increment(
-    commits: List[GitCommit],
+    commits: Iterable[GitCommit],
     regex: str = bump_pattern,
     increments_map: Union[dict, OrderedDict] = bump_map,
+    classifier: Optional[IncrementClassifier] = None,
+    cache: Optional["CommitCache"] = None,
 ) -> Optional[str]:
 
-    if isinstance(increments_map, dict):
-        increments_map = OrderedDict(increments_map)
+    if classifier is None:
+        classifier = IncrementClassifier(regex, increments_map)
 
     # Most important cases are major and minor.
     # Everything else will be considered patch.
-    select_pattern = re.compile(regex)
     increment = None
 
     for commit in commits:
-        for message in commit.message.split("\n"):
-            result = select_pattern.search(message)
-            if result:
-                found_keyword = result.group(0)
-                new_increment = None
-                for match_pattern in increments_map.keys():
-                    if re.match(match_pattern, found_keyword):
-                        new_increment = increments_map[match_pattern]
-                        break
-
-                if increment == "MAJOR":
-                    continue
-                elif increment == "MINOR" and new_increment == "MAJOR":
-                    increment = new_increment
-                elif increment == "PATCH" or increment is None:
-                    increment = new_increment
+        line_increments = cache.get_increments(commit.rev) if cache else None
+        if line_increments is None:
+            line_increments = classifier.commit_increments(commit)
+            if cache is not None:
+                cache.set_increments(commit.rev, line_increments)
+
+        for new_increment in line_increments:
+            increment = merge_increment(increment, new_increment)
+
+            # Nothing can change the final increment of the map,
+            # so the remaining commits are not read at all.
+            if increment is not None and increment == classifier.final_increment:
+                return increment
 
     return increment
 
@@ -76,7 +163,7 @@ def prerelease_generator(current_version: str, prerelease: Optional[str] = None)
     return pre_version
 
 
-def semver_generator(current_version: str, increment: str = None) -> str:
+def semver_generator(current_version: str, increment: Optional[str] = None) -> str:
     version = Version(current_version)
     prev_release = list(version.release)
     increments = [MAJOR, MINOR, PATCH]
@@ -106,7 +193,7 @@ def semver_generator(current_version: str, increment: str = None) -> str:
 
 
 def generate_version(
-    current_version: str, increment: str, prerelease: Optional[str] = None
+    current_version: str, increment: Optional[str], prerelease: Optional[str] = None
 ) -> Version:
     """Based on the given increment a proper semver will be generated.
 
@@ -126,34 +213,311 @@ def generate_version(
     return Version(f"{semver}{pre_version}")
 
 
-def update_version_in_files(current_version: str, new_version: str, files: list):
+def update_version_in_files(
+    current_version: str,
+    new_version: str,
+    files: list,
+    jobs: int = UPDATE_VERSION_JOBS,
+) -> Dict[str, List[int]]:
     """Change old version to the new one in every file given.
 
     Note that this version is not the tag formatted one.
     So for example, your tag could look like `v1.0.0` while your version in
     the package like `1.0.0`.
+
+    A location like `package.json#version` or `pyproject.toml#tool.poetry.version`
+    only updates the value of that key, which must exist.
+    Paths can be globs, like `plugins/*/__version__.py`, matching the files
+    not ignored by git. Up to `jobs` files are updated at once. Return the
+    numbers of the lines changed in each file, for the files which changed.
     """
+    paths: Dict[str, str] = {}
+    patterns: Dict[str, List[Optional[Pattern]]] = {}
+    keys: Dict[str, List[str]] = {}
     for location in files:
-        filepath, *regex = location.split(":", maxsplit=1)
-        if len(regex) > 0:
-            regex = regex[0]
-
-        # Read in the file
-        filedata = []
-        with open(filepath, "r") as f:
-            for line in f:
-                if regex:
-                    is_match = re.search(regex, line)
-                    if not is_match:
-                        filedata.append(line)
-                        continue
-
-                # Replace the target string
-                filedata.append(line.replace(current_version, new_version))
-
-        # Write the file out again
-        with open(filepath, "w") as file:
-            file.write("".join(filedata))
+        filepath, _, regex = location.partition(":")
+        filepath, _, key_path = filepath.partition("#")
+        pattern = re.compile(regex) if regex else None
+        for path in expand_version_file(filepath):
+            # Locations of the same file are applied together, in one pass
+            real_path = os.path.realpath(path)
+            paths.setdefault(real_path, path)
+            patterns.setdefault(real_path, [])
+            keys.setdefault(real_path, [])
+            if key_path:
+                keys[real_path].append(key_path)
+            else:
+                patterns[real_path].append(pattern)
+
+    def update(real_path: str) -> List[int]:
+        file_patterns = patterns[real_path]
+        return update_version_in_file(
+            paths[real_path],
+            current_version,
+            new_version,
+            None if None in file_patterns else cast(List[Pattern], file_patterns),
+            keys[real_path],
+        )
+
+    real_paths = list(paths)
+    if jobs > 1 and len(real_paths) > 1:
+        with ThreadPoolExecutor(min(jobs, len(real_paths))) as executor:
+            changed = list(executor.map(update, real_paths))
+    else:
+        changed = [update(real_path) for real_path in real_paths]
+    return {
+        paths[real_path]: lines
+        for real_path, lines in zip(real_paths, changed)
+        if lines
+    }
+
+
+# The version on its own, maybe with a v like tags: not a part of another
+# version, like 11.0.0 or 1.0.0.1, nor a requirement pinned to it, like
+# foo==1.0.0, ^1.0.0 or foo@1.0.0
+VERSION_BEFORE = (
+    r"(?:(?<![\w.<>^~@])|(?<=(?<![\w.<>^~@])[vV]))"
+    r"(?<![=<>~!]=)(?<![=<>~!]=\s)"
+)
+VERSION_AFTER = r"(?![\w+-]|\.\w)"
+
+
+class VersionOccurrence(NamedTuple):
+    line: int
+    # The text of the line before the version
+    prefix: str
+
+    @property
+    def pattern(self) -> str:
+        """Pattern of a `version_files` location selecting this line.
+
+        It matches the text before the version, which stays the same from one
+        version to the next, unlike the version itself.
+        """
+        return f"^{re.escape(self.prefix)}(?=\\d)"
+
+
+def find_version_occurrences(
+    current_version: str, files: list, exclude: Iterable[str] = ()
+) -> Dict[str, List[VersionOccurrence]]:
+    """Lines of the tracked files containing the version, from `git grep`.
+
+    Only the version on its own counts, see `VERSION_BEFORE`. The files of the
+    `files` locations and the `exclude` paths, like the configuration file, are
+    left out.
+    """
+    known = {
+        os.path.realpath(path)
+        for location in files
+        for path in expand_version_file(location.partition(":")[0].partition("#")[0])
+    }
+    known.update(os.path.realpath(path) for path in exclude)
+    version = re.compile(VERSION_BEFORE + re.escape(current_version) + VERSION_AFTER)
+    occurrences: Dict[str, List[VersionOccurrence]] = {}
+    for path, lines in git.grep_fixed_string(current_version).items():
+        if os.path.realpath(path) in known:
+            continue
+        for number, content in lines:
+            match = version.search(content.decode("utf-8", "surrogateescape"))
+            if match:
+                occurrence = VersionOccurrence(number, match.string[: match.start()])
+                occurrences.setdefault(path, []).append(occurrence)
+    return occurrences
+
+
+def version_locations(occurrences: Dict[str, List[VersionOccurrence]]) -> List[str]:
+    """`version_files` locations updating the lines found and no other."""
+    locations = (
+        f"{path}:{occurrence.pattern}"
+        for path, found in occurrences.items()
+        for occurrence in found
+    )
+    return list(OrderedDict.fromkeys(locations))
+
+
+def expand_version_file(filepath: str) -> List[str]:
+    """Files matching a glob, except the ones ignored by git, sorted."""
+    if not glob.has_magic(filepath):
+        return [filepath]
+    directory = "/" if filepath.startswith("/") else ""
+    parts = [part for part in filepath.split("/") if part not in ("", ".")]
+    matches = sorted(set(_scan_glob(directory, parts)))
+    ignored = set(git.get_ignored_paths(matches))
+    return [path for path in matches if path not in ignored]
+
+
+def _scan_dir(directory: str) -> List[os.DirEntry]:
+    try:
+        with os.scandir(directory or ".") as entries:
+            return list(entries)
+    except OSError:
+        return []
+
+
+def _scan_glob(directory: str, parts: List[str]) -> Iterator[str]:
+    """Walk only the directories the glob can match, with `os.scandir`.
+
+    Like shells do, hidden entries are only matched by explicit dots, and
+    `**` matches any number of directories.
+    """
+    part, rest = parts[0], parts[1:]
+    if not glob.has_magic(part):
+        yield from _scan_path(os.path.join(directory, part), rest)
+        return
+    if part == "**":
+        yield from _scan_tree(directory, rest or ["*"])
+        return
+    for entry in _scan_dir(directory):
+        if entry.name.startswith(".") and not part.startswith("."):
+            continue
+        if fnmatch.fnmatchcase(entry.name, part):
+            yield from _scan_path(os.path.join(directory, entry.name), rest)
+
+
+def _scan_tree(directory: str, rest: List[str]) -> Iterator[str]:
+    """Match `rest` in `directory` and in every directory below, for `**`.
+
+    The tree is walked level by level. The directories of a level are checked
+    with a single `git check-ignore`, and ignored ones, like `node_modules`,
+    are not entered.
+    """
+    level = [directory]
+    while level:
+        subdirectories: List[str] = []
+        for current in level:
+            yield from _scan_glob(current, rest)
+            subdirectories.extend(
+                os.path.join(current, entry.name)
+                for entry in _scan_dir(current)
+                # Symlinks are not followed, they could loop
+                if not entry.name.startswith(".")
+                and entry.is_dir(follow_symlinks=False)
+            )
+        # The trailing slash lets patterns only matching directories apply
+        ignored = set(git.get_ignored_paths([f"{path}/" for path in subdirectories]))
+        level = [path for path in subdirectories if f"{path}/" not in ignored]
+
+
+def _scan_path(path: str, rest: List[str]) -> Iterator[str]:
+    if rest and os.path.isdir(path):
+        yield from _scan_glob(path, rest)
+    elif not rest and os.path.isfile(path):
+        yield path
+
+
+def update_version_in_file(
+    filepath: str,
+    current_version: str,
+    new_version: str,
+    patterns: Optional[Sequence[Pattern]] = None,
+    keys: Sequence[str] = (),
+) -> List[int]:
+    """Replace the version in the lines matching one of `patterns`, or in all.
+
+    With no patterns at all, only the values of the dotted `keys` are updated,
+    found by `manifest.find_value`. Only the lines containing the current
+    version are decoded, found through a memory map of the file. The new
+    content is streamed to a temporary file replacing the original one at
+    once, and nothing is written when no line changes. Return the numbers of
+    the lines changed.
+    """
+    path = os.path.realpath(filepath)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            if keys:
+                raise ValueError(f"Could not find a value for {keys[0]} in {path}")
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            edits = _key_edits(content, path, current_version, new_version, keys)
+            if patterns is None or patterns:
+                edits.extend(
+                    _line_edits(content, current_version, new_version, patterns)
+                )
+            temporary, lines = _write_edits(content, path, edits)
+    if temporary is None:
+        return []
+    shutil.copymode(path, temporary)
+    os.replace(temporary, path)
+    return lines
+
+
+Edit = Tuple[int, int, bytes]
+
+
+def _key_edits(
+    content: mmap.mmap,
+    path: str,
+    current_version: str,
+    new_version: str,
+    keys: Sequence[str],
+) -> List[Edit]:
+    """Replace the version in the value of each key, and nowhere else."""
+    current, new = current_version.encode(), new_version.encode()
+    edits = []
+    for key in keys:
+        start, end = manifest.find_value(content, path, key)
+        value = content[start:end]
+        if current in value:
+            edits.append((start, end, value.replace(current, new)))
+    return edits
+
+
+def _line_edits(
+    content: mmap.mmap,
+    current_version: str,
+    new_version: str,
+    patterns: Optional[Sequence[Pattern]],
+) -> Iterator[Edit]:
+    current = current_version.encode()
+    position = content.find(current)
+    while position != -1:
+        start = content.rfind(b"\n", 0, position) + 1
+        end = content.find(b"\n", position)
+        end = len(content) if end == -1 else end + 1
+        # Any encoding compatible with ASCII goes through unchanged
+        line = content[start:end].decode("utf-8", "surrogateescape")
+        # Lines were matched with universal newlines
+        text = line[:-2] + "\n" if line.endswith("\r\n") else line
+        if patterns is None or any(p.search(text) for p in patterns):
+            updated = line.replace(current_version, new_version)
+            yield start, end, updated.encode("utf-8", "surrogateescape")
+        position = content.find(current, end)
+
+
+def _write_edits(
+    content: mmap.mmap, path: str, edits: List[Edit]
+) -> Tuple[Optional[str], List[int]]:
+    """Write the edited content next to `path`, `None` if nothing changed.
+
+    An edit overlapping a previous one, like a key in an updated line, is
+    skipped. Return the file written and the numbers of the lines edited.
+    """
+    if not edits:
+        return None, []
+    directory, name = os.path.split(path)
+    temporary = NamedTemporaryFile(
+        "wb", dir=directory, prefix=f".{name}.", delete=False
+    )
+    lines: List[int] = []
+    try:
+        with temporary:
+            copied = 0
+            line_number = 1
+            for start, end, replacement in sorted(edits, key=lambda e: (e[0], -e[1])):
+                if start < copied:
+                    continue
+                line_number += content[copied:start].count(b"\n")
+                if not lines or lines[-1] != line_number:
+                    lines.append(line_number)
+                line_number += content[start:end].count(b"\n")
+                temporary.write(content[copied:start])
+                temporary.write(replacement)
+                copied = end
+            temporary.write(content[copied:])
+    except BaseException:
+        os.unlink(temporary.name)
+        raise
+    return temporary.name, lines
 
 
 def create_tag(version: Union[Version, str], tag_format: Optional[str] = None):
@@ -111,6 +111,31 @@ data = {
                         "help": "manually specify the desired increment",
                         "choices": ["MAJOR", "MINOR", "PATCH"],
                     },
+                    {
+                        "name": "--no-verify",
+                        "action": "store_true",
+                        "help": "skip the pre-commit and commit-msg hooks",
+                    },
+                    {
+                        "name": "--discover",
+                        "action": "store_true",
+                        "help": (
+                            "also update the other tracked files containing "
+                            "the current version"
+                        ),
+                    },
+                ],
+            },
+            {
+                "name": ["discover"],
+                "help": "find the tracked files containing the current version",
+                "func": commands.Discover,
+                "arguments": [
+                    {
+                        "name": "--yes",
+                        "action": "store_true",
+                        "help": "add every file found to version_files",
+                    },
                 ],
             },
             {
@@ -163,6 +188,15 @@ data = {
                         "help": "a range of git rev to check. e.g, master..HEAD",
                         "exclusive_group": "group1",
                     },
+                    {
+                        "name": ["--jobs", "-j"],
+                        "type": int,
+                        "default": 1,
+                        "help": (
+                            "number of git processes reading the commits, "
+                            "to audit very large ranges"
+                        ),
+                    },
                 ],
             },
             {
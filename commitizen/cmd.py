@@ -1,21 +1,140 @@
+import asyncio
+import os
 import subprocess
-from typing import NamedTuple
+import sys
+from io import BufferedReader
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Sequence, Union, cast
 
 
-class Command(NamedTuple):
-    out: str
-    err: str
-    stdout: bytes
-    stderr: bytes
+class Command:
+    """Output of a command.
 
+    When built with `from_output`, `out` and `err` are only decoded the first
+    time they are read, most callers only look at one of them.
+    """
 
-def run(cmd: str) -> Command:
+    def __init__(
+        self,
+        out: Optional[str],
+        err: Optional[str],
+        stdout: bytes,
+        stderr: bytes,
+        return_code: int = 0,
+    ):
+        self._out = out
+        self._err = err
+        self.stdout = stdout
+        self.stderr = stderr
+        self.return_code = return_code
+
+    @classmethod
+    def from_output(cls, stdout: bytes, stderr: bytes, return_code: int) -> "Command":
+        return cls(None, None, stdout, stderr, return_code)
+
+    @property
+    def out(self) -> str:
+        if self._out is None:
+            self._out = self.stdout.decode()
+        return self._out
+
+    @property
+    def err(self) -> str:
+        if self._err is None:
+            self._err = self.stderr.decode()
+        return self._err
+
+
+def run(
+    cmd: Union[str, Sequence[str]],
+    input: Optional[bytes] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Command:
+    """Run a command and wait for it.
+
+    A list of arguments is executed directly, a string goes through the shell.
+    `input` is written to its standard input, `env` is added to the
+    environment.
+    """
     process = subprocess.Popen(
-        cmd,
-        shell=True,
+        cmd if isinstance(cmd, str) else list(cmd),
+        shell=isinstance(cmd, str),
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         stdin=subprocess.PIPE,
+        env={**os.environ, **env} if env else None,
+    )
+    stdout, stderr = process.communicate(input)
+    return Command.from_output(stdout, stderr, process.returncode)
+
+
+def stream(
+    args: Sequence[str], separator: bytes = b"\n", chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Yield the `separator` delimited records printed by a command.
+
+    The output is read incrementally from the pipe, memory is bounded by the
+    biggest record. Closing the generator before it is exhausted stops the
+    command.
+    """
+    process = subprocess.Popen(
+        list(args), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
     )
-    stdout, stderr = process.communicate()
-    return Command(stdout.decode(), stderr.decode(), stdout, stderr)
+    stdout = cast(BufferedReader, process.stdout)
+    try:
+        pending = b""
+        for chunk in iter(lambda: stdout.read1(chunk_size), b""):
+            *records, pending = (pending + chunk).split(separator)
+            yield from records
+        if pending:
+            yield pending
+    finally:
+        if process.poll() is None:
+            process.kill()
+        stdout.close()
+        process.wait()
+
+
+async def run_async(*args: str) -> Command:
+    """Run a command without a shell, letting other commands run meanwhile."""
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        stdin=subprocess.DEVNULL,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # The result is not needed anymore
+        process.kill()
+        await process.wait()
+        raise
+    return Command.from_output(stdout, stderr, cast(int, process.returncode))
+
+
+def gather(*awaitables: Awaitable) -> List[Any]:
+    """Run independent commands concurrently and return their results in order.
+
+    A new event loop is used, so it can be called from synchronous code. The
+    current loop of the caller, if any, stays current.
+    """
+
+    async def gather_all() -> List[Any]:
+        # Inside the new loop, so the futures belong to it
+        return await asyncio.gather(*awaitables)
+
+    loop = asyncio.new_event_loop()
+    # Python < 3.8 only watches child processes of the current loop
+    watch = sys.version_info < (3, 8)
+    if watch:
+        try:
+            previous: Optional[asyncio.AbstractEventLoop] = asyncio.get_event_loop()
+        except RuntimeError:
+            previous = None
+        asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(gather_all())
+    finally:
+        if watch:
+            asyncio.set_event_loop(previous)
+        loop.close()
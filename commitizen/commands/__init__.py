@@ -1,6 +1,7 @@
 from .bump import Bump
 from .check import Check
 from .commit import Commit
+from .discover import Discover
 from .example import Example
 from .info import Info
 from .init import Init
@@ -12,6 +13,7 @@ __all__ = (
     "Bump",
     "Check",
     "Commit",
+    "Discover",
     "Example",
     "Info",
     "ListCz",
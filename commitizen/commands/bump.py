@@ -1,12 +1,17 @@
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple, cast
 
 import questionary
 from packaging.version import Version
 
-from commitizen import bump, factory, git, out
+from commitizen import bump, ere, factory, git, git_objects, monorepo, out, tags
+from commitizen.commit_cache import CommitCache
 from commitizen.config import BaseConfig
 from commitizen.error_codes import (
     COMMIT_FAILED,
+    INVALID_CONFIG,
+    INVALID_VERSION_FILE,
     NO_COMMITS_FOUND,
     NO_PATTERN_MAP,
     NO_VERSION_SPECIFIED,
@@ -30,10 +35,33 @@ class Bump:
         }
         self.cz = factory.commiter_factory(self.config)
 
-    def is_initial_tag(self, current_tag_version: str, is_yes: bool = False) -> bool:
+    def grep_filters(self) -> List[str]:
+        """`git log` options only listing the commits `bump_pattern` selects.
+
+        Opt-in with `bump_grep`, the pattern is left to Python when git could
+        select different commits.
+        """
+        if not self.config.settings.get("bump_grep") or not self.cz.bump_pattern:
+            return []
+        grep = ere.translate(self.cz.bump_pattern)
+        if grep is None:
+            out.info("bump_pattern cannot be used by git --grep, reading every commit")
+            return []
+        return grep.git_args()
+
+    def is_initial_tag(
+        self,
+        current_tag_version: str,
+        is_yes: bool = False,
+        tag_index: Optional[tags.TagIndex] = None,
+    ) -> bool:
         """Check if reading the whole git tree up to HEAD is needed."""
         is_initial = False
-        if not git.tag_exist(current_tag_version):
+        if tag_index is None:
+            tag_index = tags.TagIndex.from_git(
+                self.bump_settings["tag_format"] or "$version"
+            )
+        if current_tag_version not in tag_index:
             if is_yes:
                 is_initial = True
             else:
@@ -45,36 +73,160 @@ class Bump:
                         "- tag_format is missing, check them using 'git tag --list'\n"
                     )
                 )
+                current_version = tag_index.parse(current_tag_version)
+                latest_tag = current_version and tag_index.latest_below(current_version)
+                if latest_tag:
+                    out.info(
+                        f"Latest tag matching tag_format before it: {latest_tag}\n"
+                    )
                 is_initial = questionary.confirm("Is this the first tag created?").ask()
         return is_initial
 
-    def find_increment(self, commits: List[git.GitCommit]) -> Optional[str]:
+    def read_tags_and_log(
+        self, git_log: Iterator[git.GitCommit]
+    ) -> Tuple[tags.TagIndex, Optional[git.GitCommit]]:
+        """List the tags while `git log` since the current tag starts.
+
+        Only the first commit is read, the rest of the log is still streamed
+        so `find_increment` can stop it early. The log is only meaningful
+        when the current tag exists.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            tag_names = executor.submit(git.get_tag_names)
+            first_commit = next(git_log, None)
+            tag_index = tags.TagIndex(
+                tag_names.result() or [], self.bump_settings["tag_format"] or "$version"
+            )
+        return tag_index, first_commit
+
+    def find_increment(
+        self, commits: Iterable[git.GitCommit], cache: Optional[CommitCache] = None
+    ) -> Optional[str]:
         bump_pattern = self.cz.bump_pattern
         bump_map = self.cz.bump_map
         if not bump_map or not bump_pattern:
             out.error(f"'{self.config.settings['name']}' rule does not support bump")
             raise SystemExit(NO_PATTERN_MAP)
         increment = bump.find_increment(
-            commits, regex=bump_pattern, increments_map=bump_map
+            commits, classifier=self.cz.increment_classifier, cache=cache
         )
         return increment
 
-    def __call__(self):  # noqa: C901
-        """Steps executed to bump."""
+    def find_releases(self, packages: List[monorepo.Package]) -> List[monorepo.Release]:
+        """Next version of every package with new commits since its tag."""
+        is_yes: bool = self.arguments["yes"]
+        increment: Optional[str] = self.arguments["increment"]
+        prerelease: str = self.arguments["prerelease"]
+
+        tag_index = tags.TagIndex.from_git()
+        initial = set()
+        for package in packages[:]:
+            if package.tag in tag_index:
+                continue
+            if self.is_initial_tag(package.tag, is_yes, tag_index):
+                initial.add(package.name)
+            else:
+                packages.remove(package)
+
+        releases = []
+        package_commits = monorepo.find_package_commits(packages, initial)
+        for package in packages:
+            commits = package_commits[package.name]
+            is_prerelease = Version(package.version).is_prerelease
+            if not commits and not is_prerelease:
+                continue
+            package_increment = increment or self.find_increment(commits)
+            if prerelease and is_prerelease:
+                package_increment = None
+            new_version = bump.generate_version(
+                package.version, package_increment, prerelease=prerelease
+            )
+            releases.append(monorepo.Release(package, package_increment, new_version))
+        return releases
+
+    def load_packages(self) -> List[monorepo.Package]:
         try:
-            current_version_instance: Version = Version(self.bump_settings["version"])
-        except TypeError:
-            out.error(
-                "[NO_VERSION_SPECIFIED]\n"
-                "Check if current version is specified in config file, like:\n"
-                "version = 0.4.3\n"
+            return monorepo.load_packages(self.config.settings)
+        except ValueError as e:
+            out.error(f"[INVALID_CONFIG]\n{e}")
+            raise SystemExit(INVALID_CONFIG)
+
+    def bump_packages(self):
+        """Bump every package of the `packages` setting in one commit."""
+        releases = self.find_releases(self.load_packages())
+        if not releases:
+            out.error("[NO_COMMITS_FOUND]\n" "No new commits found.")
+            raise SystemExit(NO_COMMITS_FOUND)
+
+        for release in releases:
+            out.write(
+                f"{release.package.name}\n"
+                f"tag to create: {release.new_tag}\n"
+                f"increment detected: {release.increment}\n"
             )
-            raise SystemExit(NO_VERSION_SPECIFIED)
+        if self.arguments["dry_run"]:
+            raise SystemExit()
 
-        # Initialize values from sources (conf)
-        current_version: str = self.config.settings["version"]
+        changed_files = [str(self.config.path)]
+        for release in releases:
+            package = release.package
+            changed_files += self.update_version_files(
+                package.version, release.new_version.public, package.version_files
+            )
+        # Like a single package, --files-only leaves the configuration as is
+        if self.arguments["files_only"]:
+            raise SystemExit()
+        for release in releases:
+            self.config.set_key(
+                f"packages.{release.package.name}.version",
+                release.new_version.public,
+            )
+
+        self.commit_files(monorepo.create_commit_message(releases), changed_files)
+        for release in releases:
+            c = git.tag(release.new_tag)
+            if c.err:
+                out.error(c.err)
+                raise SystemExit(TAG_FAILED)
+        out.success("Done!")
+
+    def __call__(self):  # noqa: C901
+        """Steps executed to bump."""
+        if self.config.settings.get("packages"):
+            return self.bump_packages()
 
         tag_format: str = self.bump_settings["tag_format"]
+        is_scm_version = self.config.settings.get("version_provider") == "scm"
+        if is_scm_version:
+            current_tag_version = tags.find_current_tag(tag_format)
+            if current_tag_version is None:
+                out.error(
+                    "[NO_VERSION_SPECIFIED]\n"
+                    "No tag matching tag_format was found, create the first one, like:\n"
+                    f"git tag {bump.create_tag('0.1.0', tag_format=tag_format)}\n"
+                )
+                raise SystemExit(NO_VERSION_SPECIFIED)
+            current_version_instance = cast(
+                Version, tags.TagIndex([], tag_format).parse(current_tag_version)
+            )
+            current_version = str(current_version_instance)
+        else:
+            try:
+                current_version_instance = Version(self.bump_settings["version"])
+            except TypeError:
+                out.error(
+                    "[NO_VERSION_SPECIFIED]\n"
+                    "Check if current version is specified in config file, like:\n"
+                    "version = 0.4.3\n"
+                )
+                raise SystemExit(NO_VERSION_SPECIFIED)
+
+            # Initialize values from sources (conf)
+            current_version = self.config.settings["version"]
+            current_tag_version = bump.create_tag(
+                current_version, tag_format=tag_format
+            )
+
         bump_commit_message: str = self.bump_settings["bump_message"]
         version_files: list = self.bump_settings["version_files"]
 
@@ -84,24 +236,60 @@ class Bump:
         prerelease: str = self.arguments["prerelease"]
         is_files_only: Optional[bool] = self.arguments["files_only"]
 
-        current_tag_version: str = bump.create_tag(
-            current_version, tag_format=tag_format
+        # Cached commits are classified without reading their message
+        cache = CommitCache.from_config(self.cz)
+        iter_commits = git_objects.commit_iterator(
+            self.config.settings, lazy=bool(cache)
+        )
+        # Commits changing only ignored paths are filtered out by git
+        pathspecs = git.get_pathspecs(
+            self.config.settings.get("bump_paths", []),
+            self.config.settings.get("bump_ignore_paths", []),
         )
+        # Commits no line of which can bump are filtered out by git too
+        walk_filters = git_objects.walk_filters(self.config.settings)
+        filters = walk_filters + self.grep_filters()
 
-        is_initial = self.is_initial_tag(current_tag_version, is_yes)
-        if is_initial:
-            commits = git.get_commits()
-        else:
-            commits = git.get_commits(current_tag_version)
+        # Expecting the tag to exist, `git log` starts alongside `git tag`
+        tag_index, git_log, first_commit = None, None, None
+        if not is_scm_version and iter_commits is git.iter_commits:
+            git_log = iter_commits(
+                current_tag_version, pathspecs=pathspecs, filters=filters
+            )
+            tag_index, first_commit = self.read_tags_and_log(git_log)
+
+        # The tag of a version read from git always exists
+        is_initial = not is_scm_version and self.is_initial_tag(
+            current_tag_version, is_yes, tag_index
+        )
+        start = None if is_initial else current_tag_version
+        if git_log is None or is_initial:
+            if git_log is not None:
+                git_log.close()
+            git_log = iter_commits(start, pathspecs=pathspecs, filters=filters)
+            first_commit = next(git_log, None)
 
         # No commits, there is no need to create an empty tag.
         # Unless we previously had a prerelease.
-        if not commits and not current_version_instance.is_prerelease:
+        has_commits = first_commit is not None
+        if not has_commits and filters != walk_filters:
+            # None can bump, the bump fails further down if there are any
+            has_commits = git.has_commits(
+                start, pathspecs=pathspecs, filters=walk_filters
+            )
+        if not has_commits and not current_version_instance.is_prerelease:
             out.error("[NO_COMMITS_FOUND]\n" "No new commits found.")
             raise SystemExit(NO_COMMITS_FOUND)
 
         if increment is None:
-            increment = self.find_increment(commits)
+            commits = chain([first_commit], git_log) if first_commit else []
+            increment = self.find_increment(commits, cache)
+
+        # find_increment stops as soon as nothing can raise the increment,
+        # the rest of the history is not needed.
+        git_log.close()
+        if cache:
+            cache.close()
 
         # Increment is removed when current and next version
         # are expected to be prereleases.
@@ -123,21 +311,82 @@ class Bump:
             f"increment detected: {increment}\n"
         )
 
+        if self.arguments.get("discover"):
+            version_files = self.discover_version_files(current_version, version_files)
+
         # Do not perform operations over files or git.
         if dry_run:
             raise SystemExit()
 
-        bump.update_version_in_files(current_version, new_version.public, version_files)
+        changed_files = self.update_version_files(
+            current_version, new_version.public, version_files
+        )
         if is_files_only:
             raise SystemExit()
 
-        self.config.set_key("version", new_version.public)
-        c = git.commit(message, args="-a")
-        if c.err:
-            out.error('git.commit errror: "{}"'.format(c.err.strip()))
-            raise SystemExit(COMMIT_FAILED)
+        # The new tag is the version source, there is nothing to write back
+        if not is_scm_version:
+            self.config.set_key("version", new_version.public)
+            changed_files.append(str(self.config.path))
+        # Without version_files, a version read from git only needs the tag
+        if changed_files:
+            self.commit_files(message, changed_files)
         c = git.tag(new_tag_version)
         if c.err:
             out.error(c.err)
             raise SystemExit(TAG_FAILED)
         out.success("Done!")
+
+    def discover_version_files(
+        self, current_version: str, version_files: List[str]
+    ) -> List[str]:
+        """Add the other tracked files containing the version, once confirmed."""
+        occurrences = bump.find_version_occurrences(
+            current_version,
+            version_files,
+            [str(self.config.path)] if self.config.path else [],
+        )
+        if not occurrences:
+            return version_files
+        out.write("other files containing the current version:")
+        for path, lines in occurrences.items():
+            out.write(f"{path}: line {', '.join(str(o.line) for o in lines)}")
+        if self.arguments["dry_run"]:
+            return version_files
+        if (
+            not self.arguments["yes"]
+            and not questionary.confirm("Update these files too?").ask()
+        ):
+            return version_files
+        return [*version_files, *bump.version_locations(occurrences)]
+
+    def update_version_files(
+        self, current_version: str, new_version: str, version_files: List[str]
+    ) -> List[str]:
+        """Update the version files, list and return the ones which changed."""
+        try:
+            updated = bump.update_version_in_files(
+                current_version, new_version, version_files
+            )
+        except ValueError as e:
+            out.error(str(e))
+            raise SystemExit(INVALID_VERSION_FILE)
+        for path, lines in updated.items():
+            out.write(f"updated {path}: line {', '.join(map(str, lines))}")
+        return list(updated)
+
+    def commit_files(self, message: str, paths: List[str]):
+        """Commit the files bump changed and nothing else.
+
+        Without hooks to run, the commit is built from HEAD and these files
+        only, so its cost does not depend on the size of the worktree.
+        """
+        if self.arguments.get("no_verify"):
+            c = git.commit_paths(message, paths)
+        else:
+            c = git.add(*paths)
+            if c.return_code == 0:
+                c = git.commit(message, paths=paths)
+        if c.return_code != 0:
+            out.error('git.commit errror: "{}"'.format(c.err.strip()))
+            raise SystemExit(COMMIT_FAILED)
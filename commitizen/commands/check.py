@@ -1,8 +1,10 @@
+import contextlib
 import os
 import re
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple, cast
 
-from commitizen import factory, git, out
+from commitizen import factory, git, git_objects, out
+from commitizen.commit_cache import CommitCache
 from commitizen.config import BaseConfig
 from commitizen.error_codes import INVALID_COMMIT_MSG
 
@@ -24,6 +26,7 @@ class Check:
         """
         self.commit_msg_file: Optional[str] = arguments.get("commit_msg_file")
         self.rev_range: Optional[str] = arguments.get("rev_range")
+        self.jobs: int = int(arguments.get("jobs") or 1)
 
         self._valid_command_argument()
 
@@ -49,28 +52,63 @@ class Check:
             if the commit provided not follows the conventional pattern
 
         """
-        commit_msgs = self._get_commit_messages()
         pattern = self.cz.schema_pattern()
-        for commit_msg in commit_msgs:
-            if not Check.validate_commit_message(commit_msg, pattern):
-                out.error(
-                    "commit validation: failed!\n"
-                    "please enter a commit message in the commitizen format.\n"
-                    f"commit: {commit_msg}\n"
-                    f"pattern: {pattern}"
-                )
-                raise SystemExit(INVALID_COMMIT_MSG)
+        with contextlib.closing(self._validate_commit_messages(pattern)) as results:
+            for commit_msg, valid in results:
+                if not valid:
+                    out.error(
+                        "commit validation: failed!\n"
+                        "please enter a commit message in the commitizen format.\n"
+                        f"commit: {commit_msg}\n"
+                        f"pattern: {pattern}"
+                    )
+                    raise SystemExit(INVALID_COMMIT_MSG)
         out.success("Commit validation: successful!")
 
-    def _get_commit_messages(self):
+    def _validate_commit_messages(self, pattern) -> Iterator[Tuple[str, bool]]:
         # Get commit message from file (--commit-msg-file)
         if self.commit_msg_file:
             with open(self.commit_msg_file, "r") as commit_file:
                 commit_msg = commit_file.read()
-            return [commit_msg]
+            yield commit_msg, Check.validate_commit_message(commit_msg, pattern)
+            return
 
         # Get commit messages from git log (--rev-range)
-        return [commit.message for commit in git.get_commits(end=self.rev_range)]
+        cache = CommitCache.from_config(self.cz)
+        filters = git_objects.walk_filters(self.config.settings)
+        if cache is None:
+            for message in self._iter_messages(filters):
+                yield message, Check.validate_commit_message(message, pattern)
+            return
+
+        # Commits already known to be valid are not read at all
+        try:
+            iter_commits = git_objects.commit_iterator(
+                self.config.settings, lazy=True, jobs=self.jobs
+            )
+            for commit in iter_commits(end=self.rev_range, filters=filters):
+                if cache.get_valid(commit.rev):
+                    continue
+                valid = Check.validate_commit_message(commit.message, pattern)
+                cache.set_valid(commit.rev, valid)
+                yield commit.message, valid
+        finally:
+            cache.close()
+
+    def _iter_messages(self, filters: List[str]) -> Iterator[str]:
+        """Messages of the range, git only prints the fields they are made of."""
+        settings = self.config.settings
+        if self.jobs > 1 or settings.get("native_object_reader"):
+            iter_commits = git_objects.commit_iterator(settings, jobs=self.jobs)
+            for commit in iter_commits(end=self.rev_range, filters=filters):
+                yield commit.message
+            return
+        fields = ("title",) if settings.get("subject_only") else ("title", "body")
+        rows = git.iter_commit_fields(
+            fields, end=cast(str, self.rev_range), filters=filters
+        )
+        for row in rows:
+            yield git.GitCommit("", *row).message
 
     @staticmethod
     def validate_commit_message(commit_msg: str, pattern: str) -> bool:
@@ -55,7 +55,8 @@ class Commit:
     def __call__(self):
         dry_run: bool = self.arguments.get("dry_run")
 
-        if git.is_staging_clean() and not dry_run:
+        use_fsmonitor = self.config.settings.get("use_fsmonitor", False)
+        if not dry_run and git.is_staging_clean(use_fsmonitor):
             out.write("No files added to staging!")
             raise SystemExit(NOTHING_TO_COMMIT)
 
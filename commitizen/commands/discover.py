@@ -0,0 +1,63 @@
+from typing import Optional
+
+import questionary
+
+from commitizen import bump, factory, out, tags
+from commitizen.config import BaseConfig
+from commitizen.error_codes import NO_VERSION_SPECIFIED
+
+
+class Discover:
+    """Find the tracked files containing the version, to add to version_files."""
+
+    def __init__(self, config: BaseConfig, arguments: dict):
+        self.config: BaseConfig = config
+        self.arguments: dict = arguments
+        self.cz = factory.commiter_factory(self.config)
+
+    def current_version(self) -> Optional[str]:
+        if self.config.settings.get("version_provider") != "scm":
+            return self.config.settings.get("version")
+        tag_format = self.config.settings.get("tag_format") or "$version"
+        tag = tags.find_current_tag(tag_format)
+        if tag is None:
+            return None
+        return str(tags.TagIndex([], tag_format).parse(tag))
+
+    def __call__(self):
+        current_version = self.current_version()
+        if not current_version:
+            out.error(
+                "[NO_VERSION_SPECIFIED]\n"
+                "Check if current version is specified in config file, like:\n"
+                "version = 0.4.3\n"
+            )
+            raise SystemExit(NO_VERSION_SPECIFIED)
+
+        version_files = self.config.settings.get("version_files", [])
+        occurrences = bump.find_version_occurrences(
+            current_version,
+            version_files,
+            [str(self.config.path)] if self.config.path else [],
+        )
+        if not occurrences:
+            out.write(f"No other tracked file contains {current_version}")
+            return
+        for path, lines in occurrences.items():
+            out.write(f"{path}: line {', '.join(str(o.line) for o in lines)}")
+
+        if self.arguments.get("yes"):
+            new_files = list(occurrences)
+        else:
+            new_files = questionary.checkbox(
+                "Choose the files to add to version_files:",
+                choices=list(occurrences),
+                style=self.cz.style,
+            ).ask()
+        if not new_files:
+            return
+        new_locations = bump.version_locations(
+            {path: occurrences[path] for path in new_files}
+        )
+        self.config.set_key("version_files", [*version_files, *new_locations])
+        out.success(f"Added {len(new_files)} files to version_files")
@@ -5,7 +5,8 @@ from commitizen import factory, out
 from commitizen.config import BaseConfig, IniConfig, TomlConfig
 from commitizen.cz import registry
 from commitizen.defaults import long_term_support_config_files
-from commitizen.git import get_latest_tag_name, get_tag_names
+from commitizen.git import get_latest_tag_name
+from commitizen.tags import TagIndex
 
 
 class Init:
@@ -56,7 +57,8 @@ class Init:
         return name
 
     def _ask_tag(self) -> str:
-        latest_tag = get_latest_tag_name()
+        tag_index = TagIndex.from_git()
+        latest_tag = tag_index.latest() or get_latest_tag_name()
         if not latest_tag:
             out.error("No Existing Tag. Set tag to v0.0.1")
             return "0.0.1"
@@ -65,14 +67,14 @@ class Init:
             f"Is {latest_tag} the latest tag?", style=self.cz.style, default=False
         ).ask()
         if not is_correct_tag:
-            tags = get_tag_names()
+            tags = tag_index.names()
             if not tags:
                 out.error("No Existing Tag. Set tag to v0.0.1")
                 return "0.0.1"
 
             latest_tag = questionary.select(
                 "Please choose the latest tag: ",
-                choices=get_tag_names(),
+                choices=tags,
                 style=self.cz.style,
             ).ask()
 
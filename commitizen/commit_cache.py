@@ -0,0 +1,133 @@
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from commitizen import git
+from commitizen.cz.base import BaseCommitizen
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    rev TEXT NOT NULL,
+    rules TEXT NOT NULL,
+    increments TEXT,
+    valid INTEGER,
+    used REAL NOT NULL,
+    PRIMARY KEY (rev, rules)
+);
+CREATE INDEX IF NOT EXISTS commits_used ON commits (used);
+"""
+
+
+def rules_fingerprint(cz: BaseCommitizen) -> str:
+    """Hash of the rules a cached result depends on."""
+    try:
+        schema_pattern = cz.schema_pattern()
+    except NotImplementedError:
+        schema_pattern = None
+    rules = [cz.bump_pattern, list((cz.bump_map or {}).items()), schema_pattern]
+    # Only the titles are classified, leaving the other fingerprints unchanged
+    if cz.config.settings.get("subject_only"):
+        rules.append("subject_only")
+    return hashlib.sha1(json.dumps(rules).encode()).hexdigest()
+
+
+class CommitCache:
+    """Per commit classification results, stored under `.git/commitizen/`.
+
+    Entries are keyed by the commit sha and the fingerprint of the active
+    rules, so changing `bump_pattern`, `bump_map` or `schema_pattern`
+    never returns stale results. Reads are served from sqlite right away,
+    writes and usage updates are flushed in a single transaction on `close`,
+    where the least recently used entries above `max_entries` are evicted.
+    sqlite locking makes parallel hook runs safe.
+    """
+
+    def __init__(self, path: Path, rules: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.rules = rules
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(str(path), timeout=30)
+        self._connection.executescript(SCHEMA)
+        self._increments: Dict[str, List[Optional[str]]] = {}
+        self._valid: Dict[str, bool] = {}
+        self._used: Set[str] = set()
+
+    @classmethod
+    def from_config(cls, cz: BaseCommitizen) -> Optional["CommitCache"]:
+        """Open the cache of the current repository if it is enabled."""
+        settings = cz.config.settings
+        if not settings.get("commit_cache"):
+            return None
+        git_dir = git.find_git_dir()
+        if git_dir is None:
+            return None
+        return cls(
+            git_dir / "commitizen" / "commits.sqlite",
+            rules_fingerprint(cz),
+            settings.get("commit_cache_size", DEFAULT_MAX_ENTRIES),
+        )
+
+    def _get(self, rev: str, column: str):
+        row = self._connection.execute(
+            f"SELECT {column} FROM commits WHERE rev = ? AND rules = ?",
+            (rev, self.rules),
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        self._used.add(rev)
+        return row[0]
+
+    def get_increments(self, rev: str) -> Optional[List[Optional[str]]]:
+        """Increment of every line selected by `bump_pattern`, if cached."""
+        increments = self._get(rev, "increments")
+        return None if increments is None else json.loads(increments)
+
+    def set_increments(self, rev: str, increments: List[Optional[str]]):
+        self._increments[rev] = increments
+
+    def get_valid(self, rev: str) -> Optional[bool]:
+        """Whether the message matches `schema_pattern`, if cached."""
+        valid = self._get(rev, "valid")
+        return None if valid is None else bool(valid)
+
+    def set_valid(self, rev: str, valid: bool):
+        self._valid[rev] = valid
+
+    def close(self):
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE commits SET used = ? WHERE rev = ? AND rules = ?",
+                ((now, rev, self.rules) for rev in self._used),
+            )
+            # Plain inserts and updates, upserts need sqlite 3.24
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO commits (rev, rules, used) VALUES (?, ?, ?)",
+                (
+                    (rev, self.rules, now)
+                    for rev in self._increments.keys() | self._valid.keys()
+                ),
+            )
+            self._connection.executemany(
+                "UPDATE commits SET increments = ?, used = ? "
+                "WHERE rev = ? AND rules = ?",
+                (
+                    (json.dumps(increments), now, rev, self.rules)
+                    for rev, increments in self._increments.items()
+                ),
+            )
+            self._connection.executemany(
+                "UPDATE commits SET valid = ?, used = ? WHERE rev = ? AND rules = ?",
+                ((valid, now, rev, self.rules) for rev, valid in self._valid.items()),
+            )
+            self._connection.execute(
+                "DELETE FROM commits WHERE rowid IN "
+                "(SELECT rowid FROM commits ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        self._connection.close()
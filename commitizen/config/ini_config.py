@@ -2,11 +2,49 @@ import configparser
 import json
 import warnings
 from pathlib import Path
-from typing import Union
+from typing import Any, Callable, Dict, Union
+
+from commitizen import out
+from commitizen.error_codes import INVALID_CONFIG
 
 from .base_config import BaseConfig
 
 
+def _unquote(value: str) -> str:
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _parse_boolean(value: str) -> bool:
+    """`true`, `false` and the other states of configparser, maybe quoted."""
+    state = _unquote(value).lower()
+    if state not in configparser.ConfigParser.BOOLEAN_STATES:
+        raise ValueError(f"not a boolean: {value}")
+    return configparser.ConfigParser.BOOLEAN_STATES[state]
+
+
+def _parse_integer(value: str) -> int:
+    return int(_unquote(value))
+
+
+# Settings which are not strings, with the function reading their value
+SETTING_PARSERS: Dict[str, Callable[[str], Any]] = {
+    "version_files": json.loads,
+    "style": json.loads,
+    "bump_paths": json.loads,
+    "bump_ignore_paths": json.loads,
+    "commit_cache": _parse_boolean,
+    "commit_cache_size": _parse_integer,
+    "native_object_reader": _parse_boolean,
+    "use_fsmonitor": _parse_boolean,
+    "bump_grep": _parse_boolean,
+    "first_parent": _parse_boolean,
+    "no_merges": _parse_boolean,
+    "subject_only": _parse_boolean,
+}
+
+
 class IniConfig(BaseConfig):
     def __init__(self, *, data: str, path: Union[Path, str]):
         super(IniConfig, self).__init__()
@@ -21,16 +59,26 @@ class IniConfig(BaseConfig):
     def set_key(self, key, value):
         """Set or update a key in the conf.
 
-        For now only strings are supported.
+        Lists are written as JSON, like `version_files`.
         We use to update the version number.
         """
         parser = configparser.ConfigParser()
         parser.read(self.path)
-        parser["commitizen"][key] = value
+        parser["commitizen"][key] = (
+            value if isinstance(value, str) else json.dumps(value)
+        )
         with open(self.path, "w") as f:
             parser.write(f)
         return self
 
+    @staticmethod
+    def _parse_value(key: str, value: str, parse: Callable[[str], Any]) -> Any:
+        try:
+            return parse(value)
+        except (TypeError, ValueError) as error:
+            out.error(f"[INVALID_CONFIG]\nInvalid {key} = {value}: {error}")
+            raise SystemExit(INVALID_CONFIG)
+
     def _parse_setting(self, data: str):
         """We expect to have a section like this
 
@@ -53,13 +101,11 @@ class IniConfig(BaseConfig):
             _data: dict = dict(config["commitizen"])
             if "files" in _data:
                 IniConfig._show_files_column_deprecated_warning()
-                _data.update({"version_files": json.loads(_data["files"])})
-
-            if "version_files" in _data:
-                _data.update({"version_files": json.loads(_data["version_files"])})
+                _data.update({"version_files": _data["files"]})
 
-            if "style" in _data:
-                _data.update({"style": json.loads(_data["style"])})
+            for key, parse in SETTING_PARSERS.items():
+                if key in _data:
+                    _data[key] = IniConfig._parse_value(key, _data[key], parse)
 
             self._settings.update(_data)
         except KeyError:
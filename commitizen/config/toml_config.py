@@ -20,13 +20,17 @@ class TomlConfig(BaseConfig):
     def set_key(self, key, value):
         """Set or update a key in the conf.
 
-        For now only strings are supported.
-        We use to update the version number.
+        Values can be strings or lists, like the version and `version_files`.
+        A dotted key, like "packages.core.version", updates a nested table.
         """
         with open(self.path, "r") as f:
             parser = parse(f.read())
 
-        parser["tool"]["commitizen"][key] = value
+        table = parser["tool"]["commitizen"]
+        *parents, name = key.split(".")
+        for parent in parents:
+            table = table[parent]
+        table[name] = value
         with open(self.path, "w") as f:
             f.write(parser.as_string())
         return self
@@ -41,7 +45,10 @@ class TomlConfig(BaseConfig):
         """
         doc = parse(data)
         try:
-            self.settings.update(doc["tool"]["commitizen"])
+            commitizen = doc["tool"]["commitizen"]
+            # Iterating the items of tomlkit tables drops all but the last of
+            # sibling sub-tables, e.g. `[tool.commitizen.packages.<name>]`
+            self.settings.update({key: commitizen[key] for key in commitizen})
         except exceptions.NonExistentKey:
             self.is_empty_config = True
 
@@ -3,6 +3,7 @@ from typing import List, Optional, Tuple
 
 from prompt_toolkit.styles import Style, merge_styles
 
+from commitizen.bump import IncrementClassifier
 from commitizen.config.base_config import BaseConfig
 
 
@@ -26,6 +27,8 @@ class BaseCommitizen(metaclass=ABCMeta):
         self.config = config
         if not self.config.settings.get("style"):
             self.config.settings.update({"style": BaseCommitizen.default_style_config})
+        self._increment_classifier: Optional[IncrementClassifier] = None
+        self._increment_classifier_rules: Optional[Tuple[str, tuple]] = None
 
     @abstractmethod
     def questions(self) -> list:
@@ -44,6 +47,19 @@ class BaseCommitizen(metaclass=ABCMeta):
             ]
         )
 
+    @property
+    def increment_classifier(self) -> Optional[IncrementClassifier]:
+        """Compiled `bump_pattern` and `bump_map`, rebuilt when they change."""
+        if not self.bump_pattern or not self.bump_map:
+            return None
+        rules = (self.bump_pattern, tuple(self.bump_map.items()))
+        if getattr(self, "_increment_classifier_rules", None) != rules:
+            self._increment_classifier = IncrementClassifier(
+                self.bump_pattern, self.bump_map
+            )
+            self._increment_classifier_rules = rules
+        return self._increment_classifier
+
     def example(self) -> Optional[str]:
         """Example of the commit message."""
         raise NotImplementedError("Not Implemented yet")
@@ -0,0 +1,209 @@
+"""Translate `bump_pattern` into a POSIX extended regex for `git log --grep`.
+
+Only the syntax with the same meaning in both dialects is translated, so git
+selects at least every line the Python regex selects. Anything else, like
+`\\s`, lookarounds or backreferences, is not translated at all.
+
+git greps the raw lines of a message, but a subject written over several lines
+is joined with spaces before it is classified. A match can span such a join,
+so only the part of the pattern before anything able to match a space is
+translated: every match starts with it, on the first line of the subject.
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Escaped outside of brackets
+ERE_SPECIAL = set(".[\\()*+?{|^$")
+
+# POSIX only guarantees bounds up to 255 (RE_DUP_MAX)
+ERE_DUP_MAX = 255
+
+# Titles and bodies are stripped before they are classified
+LINE_START = "^[[:space:]]*"
+LINE_END = "[[:space:]]*$"
+
+# `$` and `re.M` mean the same on a single line, `re.X` only affects parsing
+SUPPORTED_FLAGS = (
+    sre_parse.SRE_FLAG_UNICODE
+    | sre_parse.SRE_FLAG_IGNORECASE
+    | sre_parse.SRE_FLAG_MULTILINE
+    | sre_parse.SRE_FLAG_VERBOSE
+)
+
+
+class GrepPattern(NamedTuple):
+    regex: str
+    ignore_case: bool
+
+    def git_args(self) -> List[str]:
+        """Options of `git log` selecting the commits with a matching line."""
+        args = ["--extended-regexp", f"--grep={self.regex}"]
+        if self.ignore_case:
+            args.append("--regexp-ignore-case")
+        return args
+
+
+def translate(regex: str) -> Optional[GrepPattern]:
+    """Translate a Python regex, `None` when it cannot be done safely."""
+    try:
+        parsed = sre_parse.parse(regex)
+    except Exception:
+        return None
+    state = getattr(parsed, "state", None) or parsed.pattern
+    if state.flags & ~SUPPORTED_FLAGS:
+        return None
+    ignore_case = bool(state.flags & sre_parse.SRE_FLAG_IGNORECASE)
+    # Case folding of non-ASCII characters differs between both engines
+    if ignore_case and any(ord(character) > 127 for character in regex):
+        return None
+    translated = _translate(parsed)
+    # Nothing left to select commits with
+    if translated is None or translated[0] in ("", LINE_START):
+        return None
+    return GrepPattern(translated[0], ignore_case)
+
+
+def _literal(code: int) -> Optional[str]:
+    character = chr(code)
+    # git matches line by line
+    if character == "\n":
+        return None
+    return f"\\{character}" if character in ERE_SPECIAL else character
+
+
+def _bracket(items) -> Optional[str]:
+    """Rewrite a character class, a backslash is literal in POSIX brackets."""
+    negate = False
+    characters = set()
+    ranges = []
+    for op, value in items:
+        name = op.name
+        if name == "NEGATE":
+            negate = True
+        elif name == "LITERAL" and chr(value) != "\n":
+            characters.add(chr(value))
+        elif name == "RANGE" and not set(map(chr, value)) & set("[]^-\\\n"):
+            ranges.append(f"{chr(value[0])}-{chr(value[1])}")
+        else:
+            return None
+    # `]` goes first and `-` last, `^` and `[` after anything else
+    ordered = sorted(characters - set("]^[-"))
+    content = "".join(
+        ["]"] * ("]" in characters)
+        + ordered
+        + ranges
+        + ["^"] * ("^" in characters)
+        + ["["] * ("[" in characters)
+        + ["-"] * ("-" in characters)
+    )
+    if content == "^":
+        return "[^^]" if negate else "\\^"
+    return f"[{'^' * negate}{content}]"
+
+
+def _matches_space(name: str, value) -> bool:
+    """Whether a single character item can match the space of a joined subject."""
+    if name == "LITERAL":
+        return chr(value) == " "
+    if name == "NOT_LITERAL":
+        return chr(value) != " "
+    if name == "IN":
+        negate = any(op.name == "NEGATE" for op, _ in value)
+        has_space = any(
+            (op.name == "LITERAL" and chr(item) == " ")
+            or (op.name == "RANGE" and item[0] <= ord(" ") <= item[1])
+            for op, item in value
+        )
+        return has_space is not negate
+    return name == "ANY"
+
+
+Prefix = Tuple[str, bool]
+
+
+def _repeat(value) -> Optional[Prefix]:
+    low, high, item = value
+    prefix = _translate(item)
+    if prefix is None or low > ERE_DUP_MAX:
+        return None
+    translated, complete = prefix
+    if not complete:
+        # The subject can be joined inside any repetition, even the first one
+        return (f"({translated})", False) if low and translated else ("", False)
+    if not translated:
+        return None
+    if high == sre_parse.MAXREPEAT:
+        quantifier = {0: "*", 1: "+"}.get(low, f"{{{low},}}")
+    elif high > ERE_DUP_MAX:
+        return None
+    elif (low, high) == (0, 1):
+        quantifier = "?"
+    else:
+        quantifier = f"{{{low},{high}}}"
+    return f"({translated}){quantifier}", True
+
+
+def _branch(branches) -> Optional[Prefix]:
+    prefixes = [_translate(branch) for branch in branches]
+    if any(prefix is None or prefix == ("", True) for prefix in prefixes):
+        return None
+    translated = [prefix[0] for prefix in prefixes if prefix]
+    complete = all(prefix[1] for prefix in prefixes if prefix)
+    # An empty alternative would select every line
+    if not all(translated):
+        return "", False
+    return f"({'|'.join(translated)})", complete
+
+
+def _translate(parsed) -> Optional[Prefix]:  # noqa: C901
+    """ERE of the longest prefix of `parsed` unable to match a space.
+
+    The flag tells whether that prefix is the whole of `parsed`.
+    """
+    parts: List[str] = []
+    for op, value in parsed:
+        name = op.name
+        part: Optional[str]
+        complete = True
+        if _matches_space(name, value):
+            return "".join(parts), False
+        if name == "LITERAL":
+            part = _literal(value)
+        elif name == "NOT_LITERAL":
+            part = _bracket([(sre_parse.NEGATE, None), (sre_parse.LITERAL, value)])
+        elif name == "IN":
+            part = _bracket(value)
+        elif name == "AT" and value.name == "AT_BEGINNING":
+            part = LINE_START
+        elif name == "AT" and value.name == "AT_END":
+            part = LINE_END
+        elif name in ("BRANCH", "SUBPATTERN", "MAX_REPEAT", "MIN_REPEAT"):
+            prefix = _group(name, value)
+            if prefix is None:
+                return None
+            part, complete = prefix
+        else:
+            part = None
+        if part is None:
+            return None
+        parts.append(part)
+        if not complete:
+            return "".join(parts), False
+    return "".join(parts), True
+
+
+def _group(name: str, value) -> Optional[Prefix]:
+    if name == "BRANCH":
+        return _branch(value[1])
+    if name == "SUBPATTERN":
+        _, add_flags, del_flags, item = value
+        prefix = _translate(item)
+        if prefix is None or not prefix[0] and prefix[1] or add_flags | del_flags:
+            return None
+        return (f"({prefix[0]})" if prefix[0] else "", prefix[1])
+    # Laziness changes what matches, not whether something does
+    return _repeat(value)
@@ -4,6 +4,7 @@ NO_COMMITIZEN_FOUND = 1
 # Config
 NOT_A_GIT_PROJECT = 2
 MISSING_CONFIG = 15
+INVALID_CONFIG = 17
 
 # Bump
 NO_COMMITS_FOUND = 3
@@ -11,6 +12,7 @@ NO_VERSION_SPECIFIED = 4
 NO_PATTERN_MAP = 5
 COMMIT_FAILED = 6
 TAG_FAILED = 7
+INVALID_VERSION_FILE = 16
 
 # Commit
 NO_ANSWERS = 8
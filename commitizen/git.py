@@ -1,12 +1,40 @@
+import asyncio
+import atexit
+import contextlib
 import os
+import re
+import shlex
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import List, Optional
-
-from commitizen import cmd
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from commitizen import cmd, git_fs
+
+# Chunks of the range each job of `iter_commits_parallel` reads
+PARALLEL_CHUNKS_PER_JOB = 4
+
+# Hooks which `git commit --no-verify` still runs
+NO_VERIFY_HOOKS = ("hooks/prepare-commit-msg", "hooks/post-commit")
 
 
 class GitObject:
+    __slots__ = ()
+
     def __eq__(self, other):
         if not isinstance(other, GitObject):
             return False
@@ -14,19 +42,108 @@ class GitObject:
 
 
 class GitCommit(GitObject):
+    """A commit, kept small since whole histories are loaded at once.
+
+    Full shas are stored as 20 bytes. The body of a commit read from a log
+    is only an offset into the log buffer until it is used, and the message
+    is only built once.
+    """
+
+    __slots__ = ("_sha", "title", "_body", "_buffer", "_message")
+
     def __init__(self, rev, title, body=""):
-        self.rev = rev.strip()
+        self.rev = rev
         self.title = title.strip()
-        self.body = body.strip()
+        self._body: Union[str, int] = body.strip()
+        self._buffer: Optional[bytes] = None
+        self._message: Optional[str] = None
+
+    @classmethod
+    def from_log_record(
+        cls, buffer: bytes, start: int = 0, end: Optional[int] = None
+    ) -> "GitCommit":
+        """Build a commit from a `%H%n%s%n%b` record of `buffer[start:end]`.
+
+        The record must end at a NUL or at the end of the buffer.
+        """
+        end = len(buffer) if end is None else end
+        rev_end = buffer.find(b"\n", start, end)
+        if rev_end == -1:
+            return cls(buffer[start:end].decode(), "")
+        title_end = buffer.find(b"\n", rev_end + 1, end)
+        if title_end == -1:
+            return cls(
+                buffer[start:rev_end].decode(), buffer[rev_end + 1 : end].decode()
+            )
+        commit = cls(
+            buffer[start:rev_end].decode(), buffer[rev_end + 1 : title_end].decode()
+        )
+        if title_end + 1 < end:
+            commit._body = title_end + 1
+            commit._buffer = buffer
+        return commit
 
     @property
-    def message(self):
-        return f"{self.title}\n\n{self.body}".strip()
+    def rev(self) -> str:
+        return self._sha.hex() if isinstance(self._sha, bytes) else self._sha
+
+    @rev.setter
+    def rev(self, rev: str):
+        rev = rev.strip()
+        self._sha: Union[str, bytes] = rev
+        # Anything else, like the revisions of tests, is kept as is
+        if len(rev) == 40 and rev == rev.lower():
+            with contextlib.suppress(ValueError):
+                self._sha = bytes.fromhex(rev)
+
+    @property
+    def body(self) -> str:
+        if self._buffer is not None:
+            start = cast(int, self._body)
+            end = self._buffer.find(b"\0", start)
+            body = self._buffer[start : None if end == -1 else end]
+            self._body = body.decode().strip()
+            self._buffer = None
+        return cast(str, self._body)
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = f"{self.title}\n\n{self.body}".strip()
+        return self._message
 
     def __repr__(self):
         return f"{self.title} ({self.rev})"
 
 
+class LazyGitCommit(GitCommit):
+    """A commit whose message is only read when it is used.
+
+    With `subject_only`, the body is left out like `iter_subjects` does.
+    """
+
+    __slots__ = ("_commit", "_subject_only")
+
+    def __init__(self, rev, subject_only: bool = False):
+        self.rev = rev
+        self._commit: Optional[GitCommit] = None
+        self._message = None
+        self._subject_only = subject_only
+
+    def _load(self) -> GitCommit:
+        if self._commit is None:
+            self._commit = get_commit(self.rev) or GitCommit(self.rev, "")
+        return self._commit
+
+    @property
+    def title(self):
+        return self._load().title
+
+    @property
+    def body(self):
+        return "" if self._subject_only else self._load().body
+
+
 class GitTag(GitObject):
     def __init__(self, name, rev, date):
         self.rev = rev.strip()
@@ -37,20 +154,170 @@ class GitTag(GitObject):
         return f"{self.name} ({self.rev})"
 
 
+class GitObjectReader:
+    """Read objects through long-lived `git cat-file` processes.
+
+    One `--batch` and one `--batch-check` process are spawned lazily and kept
+    open, so every lookup is a round trip over a pipe instead of a new
+    shell plus git process.
+    """
+
+    def __init__(self, cwd: Optional[str] = None):
+        self.cwd = cwd or os.getcwd()
+        self._batch: Optional[subprocess.Popen] = None
+        self._batch_check: Optional[subprocess.Popen] = None
+
+    def _spawn(self, mode: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["git", "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.cwd,
+        )
+
+    @staticmethod
+    def _request(process: subprocess.Popen, rev: str) -> Optional[List[str]]:
+        stdin, stdout = cast(IO[bytes], process.stdin), cast(IO[bytes], process.stdout)
+        try:
+            stdin.write(f"{rev}\n".encode())
+            stdin.flush()
+        except BrokenPipeError:
+            # git exited, e.g. when not running inside a repository
+            return None
+        header = stdout.readline().decode().split()
+        # "<rev> missing" or "<rev> ambiguous"
+        if len(header) != 3:
+            return None
+        return header
+
+    def info(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        """Return the sha, type and size of an object, `None` if missing."""
+        if self._batch_check is None:
+            self._batch_check = self._spawn("--batch-check")
+        header = self._request(self._batch_check, rev)
+        if not header:
+            return None
+        sha, object_type, size = header
+        return sha, object_type, int(size)
+
+    def read(self, rev: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return the sha, type and raw content of an object, `None` if missing."""
+        if self._batch is None:
+            self._batch = self._spawn("--batch")
+        header = self._request(self._batch, rev)
+        if not header:
+            return None
+        sha, object_type, size = header
+        stdout = cast(IO[bytes], self._batch.stdout)
+        content = stdout.read(int(size))
+        # Every object is followed by a LF
+        stdout.read(1)
+        return sha, object_type, content
+
+    def close(self):
+        for process in (self._batch, self._batch_check):
+            if process is None:
+                continue
+            with contextlib.suppress(BrokenPipeError):
+                cast(IO[bytes], process.stdin).close()
+            process.wait()
+        self._batch = None
+        self._batch_check = None
+
+
+_object_readers: Dict[str, GitObjectReader] = {}
+
+
+def get_object_reader(cwd: Optional[str] = None) -> GitObjectReader:
+    """Return the reader of the repository at `cwd`, spawning it once."""
+    cwd = os.path.abspath(cwd or os.getcwd())
+    if cwd not in _object_readers:
+        _object_readers[cwd] = GitObjectReader(cwd)
+    return _object_readers[cwd]
+
+
+@atexit.register
+def close_object_readers():
+    for reader in _object_readers.values():
+        reader.close()
+    _object_readers.clear()
+
+
 def tag(tag: str):
-    c = cmd.run(f"git tag {tag}")
+    c = cmd.run(["git", "tag", tag])
     return c
 
 
-def commit(message: str, args=""):
+def add(*paths: str) -> cmd.Command:
+    return cmd.run(["git", "add", "--", *paths])
+
+
+def commit(message: str, args="", paths: Sequence[str] = ()):
+    """Commit the index, or only `paths` when given.
+
+    With `paths`, git only refreshes and commits those files, whatever else
+    is staged or modified is left as it is.
+    """
     f = NamedTemporaryFile("wb", delete=False)
     f.write(message.encode("utf-8"))
     f.close()
-    c = cmd.run(f"git commit {args} -F {f.name}")
+    only = ["--only", "--", *paths] if paths else []
+    c = cmd.run(["git", "commit", *shlex.split(args), "-F", f.name, *only])
     os.unlink(f.name)
     return c
 
 
+def _commit_needs_porcelain() -> bool:
+    """Whether `git commit --no-verify` would sign or run hooks."""
+    c = cmd.run(["git", "config", "--bool", "commit.gpgSign"])
+    if c.out.strip() == "true":
+        return True
+    args = [arg for hook in NO_VERIFY_HOOKS for arg in ("--git-path", hook)]
+    c = cmd.run(["git", "rev-parse", *args])
+    return any(os.access(path, os.X_OK) for path in c.out.splitlines())
+
+
+def commit_paths(message: str, paths: Sequence[str]) -> cmd.Command:
+    """Commit `paths` on top of HEAD with plumbing commands, without hooks.
+
+    The tree is built in a temporary index read from HEAD, so git never
+    looks at any other file of the worktree and nothing else staged is
+    committed. The paths are then staged in the real index too. When the
+    commit must be signed, or hooks `--no-verify` keeps are installed, it
+    goes through `git commit --no-verify --only` instead.
+    """
+    head = rev_parse_commits(["HEAD"])
+    if not head or _commit_needs_porcelain():
+        c = add(*paths)
+        if c.return_code != 0:
+            return c
+        return commit(message, args="--no-verify", paths=paths)
+    with TemporaryDirectory() as directory:
+        env = {"GIT_INDEX_FILE": os.path.join(directory, "index")}
+        for args in (
+            ["read-tree", "HEAD"],
+            ["update-index", "--add", "--", *paths],
+            ["write-tree"],
+        ):
+            c = cmd.run(["git", *args], env=env)
+            if c.return_code != 0:
+                return c
+    c = cmd.run(
+        ["git", "commit-tree", c.out.strip(), "-p", head[0], "-F", "-"],
+        input=message.encode("utf-8"),
+    )
+    if c.return_code != 0:
+        return c
+    title = message.partition("\n")[0]
+    c = cmd.run(
+        ["git", "update-ref", "-m", f"commit: {title}", "HEAD", c.out.strip(), head[0]]
+    )
+    if c.return_code != 0:
+        return c
+    return cmd.run(["git", "update-index", "--add", "--", *paths])
+
+
 def get_commits(
     start: Optional[str] = None,
     end: str = "HEAD",
@@ -61,12 +328,8 @@ def get_commits(
     """
     Get the commits betweeen start and end
     """
-    git_log_cmd = f"git log --pretty={log_format}{delimiter}"
-
-    if start:
-        c = cmd.run(f"{git_log_cmd} {start}..{end}")
-    else:
-        c = cmd.run(f"{git_log_cmd} {end}")
+    rev = f"{start}..{end}" if start else end
+    c = cmd.run(["git", "log", f"--pretty={log_format}{delimiter}", rev])
 
     if not c.out:
         return []
@@ -86,14 +349,317 @@ def get_commits(
     return git_commits
 
 
+def parse_log_output(log: bytes) -> Iterator[GitCommit]:
+    """Yield the commits of `git log -z --pretty=format:%H%n%s%n%b` output.
+
+    Bodies are only decoded when used, from the log itself.
+    """
+    start = 0
+    while start < len(log):
+        end = log.find(b"\0", start)
+        end = len(log) if end == -1 else end
+        if end > start:
+            yield GitCommit.from_log_record(log, start, end)
+        start = end + 1
+
+
+def iter_commits(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    *,
+    log_format: str = "%H%n%s%n%b",
+    chunk_size: int = 64 * 1024,
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+) -> Iterator[GitCommit]:
+    """
+    Yield the commits between start and end, one at a time
+
+    `git log -z` is read incrementally from the pipe, so memory is bounded by
+    the biggest commit and not by the size of the range. Closing the
+    generator before it is exhausted stops the git process. With `pathspecs`
+    only the commits changing a matching path are read, `filters` are extra
+    options limiting the commits, like `--grep`.
+    """
+    rev = f"{start}..{end}" if start else end
+    args = ["git", "log", "-z", f"--pretty=format:{log_format}", *filters, rev]
+    args += ["--", *pathspecs]
+    for record in cmd.stream(args, b"\0", chunk_size):
+        yield GitCommit.from_log_record(record)
+
+
+def iter_commits_parallel(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    *,
+    jobs: int,
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+) -> Iterator[GitCommit]:
+    """
+    Yield the commits between start and end, read by `jobs` git processes
+
+    `git rev-list` lists the range without formatting any message, then the
+    list is cut into chunks of consecutive commits. Each chunk is read by its
+    own `git log --no-walk=unsorted --stdin`, and chunks are yielded in order.
+
+    Meant for reading whole ranges, like `cz check --jobs`: the range is
+    listed before the first commit is read, every chunk is held in memory,
+    and closing the iterator only cancels the chunks not started yet.
+    """
+    rev = f"{start}..{end}" if start else end
+    c = cmd.run(["git", "rev-list", *filters, rev, "--", *pathspecs])
+    shas = c.stdout.split()
+    # A few chunks per job, so the first ones are ready early
+    chunk_count = min(jobs * PARALLEL_CHUNKS_PER_JOB, len(shas))
+    if jobs <= 1 or chunk_count <= 1:
+        yield from iter_commits(start, end, pathspecs=pathspecs, filters=filters)
+        return
+
+    size = -(-len(shas) // chunk_count)
+    args = ["git", "log", "-z", "--pretty=format:%H%n%s%n%b"]
+    args += ["--no-walk=unsorted", "--stdin"]
+    with ThreadPoolExecutor(jobs) as executor:
+        futures = [
+            executor.submit(cmd.run, args, b"\n".join(shas[i : i + size]))
+            for i in range(0, len(shas), size)
+        ]
+        try:
+            for future in futures:
+                yield from parse_log_output(future.result().stdout)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def iter_lazy_commits(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    *,
+    chunk_size: int = 64 * 1024,
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+    subject_only: bool = False,
+) -> Iterator["LazyGitCommit"]:
+    """
+    Yield the commits between start and end without reading their messages
+
+    Only `git rev-list` is run, messages are read through the object reader
+    the first time they are used.
+    """
+    rev = f"{start}..{end}" if start else end
+    args = ["git", "rev-list", *filters, rev, "--", *pathspecs]
+    for sha in cmd.stream(args, b"\n", chunk_size):
+        yield LazyGitCommit(sha.decode(), subject_only)
+
+
+def has_commits(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+) -> bool:
+    """Check if there is any commit between start and end."""
+    rev = f"{start}..{end}" if start else end
+    args = ["git", "rev-list", "--max-count=1", *filters, rev]
+    c = cmd.run([*args, "--", *pathspecs])
+    return c.return_code == 0 and bool(c.out.strip())
+
+
+def _decode_trailers(value: bytes) -> List[Tuple[str, str]]:
+    trailers = []
+    for line in value.decode().splitlines():
+        key, _, trailer = line.partition(":")
+        trailers.append((key.strip(), trailer.strip()))
+    return trailers
+
+
+# Fields `iter_commit_fields` can read, with their `--pretty` placeholder and
+# the parser of their value. "paths" is read with `--name-only` instead.
+COMMIT_FIELDS: Dict[str, Tuple[str, Callable[[bytes], Any]]] = {
+    "rev": ("%H", bytes.decode),
+    "parents": ("%P", lambda value: value.decode().split()),
+    "title": ("%s", lambda value: value.decode().strip()),
+    "body": ("%b", lambda value: value.decode().strip()),
+    "trailers": ("%(trailers:only,unfold)", _decode_trailers),
+    "author": ("%an <%ae>", bytes.decode),
+    "date": ("%aI", bytes.decode),
+}
+
+
+def iter_commit_fields(
+    fields: Sequence[str],
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    *,
+    revs: Sequence[str] = (),
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+    chunk_size: int = 64 * 1024,
+) -> Iterator[Tuple]:
+    """
+    Yield a tuple of the requested `fields` of each commit between start and end
+
+    Only those fields are printed by git, each one followed by a NUL, e.g.
+    `("rev", "paths")` reads `%H` and the paths changed, in that order.
+    `revs` are given to `git log` as they are, in place of `start..end`.
+    """
+    if any(field not in COMMIT_FIELDS and field != "paths" for field in fields):
+        raise ValueError(f"Cannot read the commit fields {fields}")
+    # Every commit prints at least one field, it frames the paths
+    printed = [field for field in fields if field != "paths"] or ["rev"]
+    pretty = "".join(f"{COMMIT_FIELDS[field][0]}%x00" for field in printed)
+    parsers = [COMMIT_FIELDS[field][1] for field in printed]
+
+    args = ["git", "log", "-z", f"--pretty=format:{pretty}", *filters]
+    if "paths" in fields:
+        args[3:3] = ["--name-only", "--no-renames"]
+    args.extend(revs or [f"{start}..{end}" if start else end])
+    tokens = cmd.stream([*args, "--", *pathspecs], b"\0", chunk_size)
+    for first in tokens:
+        raw = [first, *islice(tokens, len(printed) - 1)]
+        values = {
+            field: parse(value) for field, parse, value in zip(printed, parsers, raw)
+        }
+        # An empty record ends the commit, paths come before it after a LF
+        paths = next(tokens, b"")
+        if paths.startswith(b"\n"):
+            values["paths"] = [paths[1:].decode()]
+            values["paths"].extend(path.decode() for path in iter(tokens.__next__, b""))
+        else:
+            values["paths"] = []
+        yield tuple(values[field] for field in fields)
+
+
+def iter_subjects(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    *,
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+) -> Iterator[GitCommit]:
+    """Commits between start and end without their body, like `iter_commits`."""
+    rows = iter_commit_fields(
+        ("rev", "title"), start, end, pathspecs=pathspecs, filters=filters
+    )
+    for rev, title in rows:
+        yield GitCommit(rev=rev, title=title)
+
+
+def iter_commits_with_paths(
+    include: List[str], exclude: List[str], *, chunk_size: int = 64 * 1024
+) -> Iterator[Tuple[GitCommit, List[str], List[str]]]:
+    """
+    Yield every commit reachable from `include` but not from `exclude`
+
+    Each commit comes with its parents and the paths it changed, children
+    always before their parents (`--topo-order`). Renames are listed as a
+    deletion and an addition, so both paths are seen.
+    """
+    rows = iter_commit_fields(
+        ("rev", "parents", "title", "body", "paths"),
+        revs=[*include, "--not", *exclude],
+        filters=["--topo-order"],
+        chunk_size=chunk_size,
+    )
+    for rev, parents, title, body, paths in rows:
+        yield GitCommit(rev=rev, title=title, body=body), parents, paths
+
+
+def rev_parse_commits(revs: List[str]) -> Optional[List[str]]:
+    """Sha of the commit each revision points to, `None` if one does not exist."""
+    c = cmd.run(["git", "rev-parse", *(f"{rev}^{{commit}}" for rev in revs)])
+    if c.return_code != 0:
+        return None
+    return c.out.split()
+
+
+def merge_base_octopus(revs: List[str]) -> Optional[str]:
+    """Best common ancestor of all the revisions, `None` if there is none."""
+    if not revs:
+        return None
+    c = cmd.run(["git", "merge-base", "--octopus", *revs])
+    if c.return_code != 0:
+        return None
+    return c.out.strip() or None
+
+
+def get_ignored_paths(paths: Sequence[str]) -> List[str]:
+    """Paths ignored by `.gitignore`, from a single `git check-ignore`.
+
+    Outside of a repository nothing is ignored.
+    """
+    if not paths:
+        return []
+    c = cmd.run(
+        ["git", "check-ignore", "--stdin", "-z"],
+        input=b"".join(f"{path}\0".encode() for path in paths),
+    )
+    # Exit status 1 means that no path is ignored
+    if c.return_code != 0:
+        return []
+    return [path for path in c.out.split("\0") if path]
+
+
+def grep_fixed_string(
+    text: str, pathspecs: Sequence[str] = ()
+) -> Dict[str, List[Tuple[int, bytes]]]:
+    """Number and content of the lines containing `text` in every tracked file.
+
+    `git grep` searches the files with several threads, binary files are
+    skipped. Paths are relative to the current directory.
+    """
+    c = cmd.run(["git", "grep", "--no-color", "-nzIF", "-e", text, "--", *pathspecs])
+    # Exit status 1 means that nothing matched
+    occurrences: Dict[str, List[Tuple[int, bytes]]] = {}
+    if c.return_code != 0:
+        return occurrences
+    # Only the names are decoded, lines can use any encoding
+    for line in c.stdout.split(b"\n")[:-1]:
+        path, number, content = line.split(b"\0", 2)
+        name = path.decode("utf-8", "surrogateescape")
+        occurrences.setdefault(name, []).append((int(number), content))
+    return occurrences
+
+
+def get_pathspecs(
+    include: Sequence[str] = (), exclude: Sequence[str] = ()
+) -> List[str]:
+    """
+    Pathspecs selecting `include` minus `exclude`, e.g. for `iter_commits`
+
+    Paths are relative to the root of the repository and may be globs.
+    Nothing to include and something to exclude means the whole tree.
+    """
+    pathspecs = [f":(top){path}" for path in include]
+    if exclude and not pathspecs:
+        pathspecs.append(":/")
+    pathspecs.extend(f":(top,exclude){path}" for path in exclude)
+    return pathspecs
+
+
+def get_commit(rev: str) -> Optional[GitCommit]:
+    """Read a single commit through the persistent object reader."""
+    # Imported here, git_objects is built on top of this module
+    from commitizen.git_objects import parse_commit
+
+    git_object = get_object_reader().read(f"{rev}^{{commit}}")
+    if git_object is None:
+        return None
+    sha, _, content = git_object
+    # Same title and body as `%s` and `%b`, like every other reader
+    _, _, title, body = parse_commit(content)
+    return GitCommit(rev=sha, title=title, body=body)
+
+
 def get_tags(dateformat: str = "%Y-%m-%d") -> List[GitTag]:
     inner_delimiter = "---inner_delimiter---"
     formatter = (
-        f"'%(refname:lstrip=2){inner_delimiter}"
+        f"%(refname:lstrip=2){inner_delimiter}"
         f"%(objectname){inner_delimiter}"
-        f"%(committerdate:format:{dateformat})'"
+        f"%(committerdate:format:{dateformat})"
     )
-    c = cmd.run(f"git tag --format={formatter} --sort=-committerdate")
+    c = cmd.run(["git", "tag", f"--format={formatter}", "--sort=-committerdate"])
     if c.err or not c.out:
         return []
 
@@ -102,33 +668,101 @@ def get_tags(dateformat: str = "%Y-%m-%d") -> List[GitTag]:
 
 
 def tag_exist(tag: str) -> bool:
-    c = cmd.run(f"git tag --list {tag}")
-    return tag in c.out
+    dirs = git_fs.discover()
+    if dirs:
+        return git_fs.read_ref(dirs, f"refs/tags/{tag}") is not None
+    return get_object_reader().info(f"refs/tags/{tag}") is not None
 
 
-def get_latest_tag_name() -> Optional[str]:
-    c = cmd.run("git describe --abbrev=0 --tags")
+def get_latest_tag_name(pattern: Optional[str] = None) -> Optional[str]:
+    """Latest tag reachable from HEAD, only matching the `pattern` glob if given."""
+    dirs = git_fs.discover()
+    if dirs and not git_fs.list_refs(dirs, "refs/tags/"):
+        return None
+    match = ["--match", pattern] if pattern else []
+    c = cmd.run(["git", "describe", "--abbrev=0", "--tags", *match])
     if c.err:
         return None
     return c.out.strip()
 
 
-def get_tag_names() -> Optional[List[str]]:
-    c = cmd.run("git tag --list")
+def get_tag_names(merged: Optional[str] = None) -> Optional[List[str]]:
+    """Every tag, only the ones reachable from `merged` if given."""
+    merged_filter = ["--merged", merged] if merged else []
+    c = cmd.run(["git", "tag", "--list", *merged_filter])
     if c.err:
         return []
     return [tag.strip() for tag in c.out.split("\n") if tag.strip()]
 
 
 def find_git_project_root() -> Optional[Path]:
-    c = cmd.run("git rev-parse --show-toplevel")
+    dirs = git_fs.discover()
+    if dirs:
+        return dirs.worktree
+    c = cmd.run(["git", "rev-parse", "--show-toplevel"])
     if not c.err:
         return Path(c.out.strip())
     return None
 
 
-def is_staging_clean() -> bool:
+def find_git_dir() -> Optional[Path]:
+    """Directory shared by every worktree of the repository, e.g. `.git`."""
+    dirs = git_fs.discover()
+    if dirs:
+        return dirs.common_dir
+    c = cmd.run(["git", "rev-parse", "--git-common-dir"])
+    if c.err:
+        return None
+    return Path(c.out.strip()).resolve()
+
+
+# Lets git ask its filesystem monitor and untracked cache what changed
+FSMONITOR_CONFIG = ("-c", "core.fsmonitor=true", "-c", "core.untrackedCache=true")
+# Before it, `core.fsmonitor=true` runs a hook command named `true`
+FSMONITOR_MIN_GIT_VERSION = (2, 36)
+
+
+def get_git_version() -> Optional[Tuple[int, ...]]:
+    """Version of the git executable, like `(2, 36, 1)`."""
+    c = cmd.run(["git", "version"])
+    match = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?", c.out)
+    if c.return_code or not match:
+        return None
+    return tuple(int(number) for number in match.groups() if number is not None)
+
+
+async def _has_diff(*args: str) -> bool:
+    """`--quiet` stops at the first difference, its exit code tells the result."""
+    c = await cmd.run_async("git", *args, "--no-ext-diff", "--quiet")
+    return c.return_code == 1
+
+
+async def is_staging_clean_async(use_fsmonitor: bool = False) -> bool:
+    """Check if staging is clean, both diffs run concurrently
+
+    As soon as one of them finds a change, the other one is stopped.
+    """
+    config: Tuple[str, ...] = ()
+    if use_fsmonitor:
+        version = get_git_version()
+        if version is not None and version >= FSMONITOR_MIN_GIT_VERSION:
+            config = FSMONITOR_CONFIG
+    checks = [
+        asyncio.ensure_future(_has_diff(*config, "diff")),
+        asyncio.ensure_future(_has_diff(*config, "diff", "--cached")),
+    ]
+    try:
+        for check in asyncio.as_completed(checks):
+            if await check:
+                return False
+        return True
+    finally:
+        for check in checks:
+            check.cancel()
+        await asyncio.gather(*checks, return_exceptions=True)
+
+
+def is_staging_clean(use_fsmonitor: bool = False) -> bool:
     """Check if staing is clean"""
-    c = cmd.run("git diff --no-ext-diff --name-only")
-    c_cached = cmd.run("git diff --no-ext-diff --cached --name-only")
-    return not (bool(c.out) or bool(c_cached.out))
+    (is_clean,) = cmd.gather(is_staging_clean_async(use_fsmonitor))
+    return is_clean
@@ -0,0 +1,139 @@
+"""Read the repository layout and refs straight from the filesystem.
+
+Only the common layouts are handled: a `.git` directory, or a `.git` file
+with a `gitdir:` line (worktrees and submodules) and loose or packed refs.
+Every function returns `None` when it cannot answer for sure, e.g. with
+`GIT_DIR` set, a reftable repository or a repository owned by another
+user, and callers then fall back to running git.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+# Any of them changes how git finds the repository
+GIT_ENVIRONMENT = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_COMMON_DIR",
+    "GIT_CEILING_DIRECTORIES",
+    "GIT_DISCOVERY_ACROSS_FILESYSTEM",
+)
+
+# Refs stored in the git dir of each worktree instead of the common one
+PER_WORKTREE_REFS = ("HEAD", "refs/bisect/", "refs/worktree/", "refs/rewritten/")
+
+
+class GitDirs(NamedTuple):
+    worktree: Path
+    git_dir: Path
+    common_dir: Path
+
+
+def _read_gitdir_file(path: Path) -> Optional[Path]:
+    """Resolve a `gitdir: <path>` file, relative paths are relative to it."""
+    try:
+        content = path.read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not content.startswith("gitdir: "):
+        return None
+    return (path.parent / content[len("gitdir: ") :].strip()).resolve()
+
+
+def _is_supported(git_dir: Path, common_dir: Path) -> bool:
+    if not (git_dir / "HEAD").is_file():
+        return False
+    # Refs are not stored as files
+    if (common_dir / "reftable").exists():
+        return False
+    # git refuses repositories owned by someone else (safe.directory)
+    if hasattr(os, "getuid") and common_dir.stat().st_uid != os.getuid():
+        return False
+    try:
+        config = (common_dir / "config").read_text()
+    except OSError:
+        return False
+    # The worktree is not where the `.git` was found
+    return "worktree" not in config and "bare = true" not in config
+
+
+def discover(cwd: Optional[str] = None) -> Optional[GitDirs]:
+    """Find the repository containing `cwd` like `git rev-parse` does."""
+    if any(variable in os.environ for variable in GIT_ENVIRONMENT):
+        return None
+    path = Path(cwd or os.getcwd()).resolve()
+    device = path.stat().st_dev
+    for directory in (path, *path.parents):
+        # git stops at filesystem boundaries
+        if directory.stat().st_dev != device:
+            return None
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            git_dir: Optional[Path] = dot_git.resolve()
+        elif dot_git.is_file():
+            git_dir = _read_gitdir_file(dot_git)
+        else:
+            continue
+        if git_dir is None:
+            return None
+        # Inside the git dir itself there is no worktree
+        if git_dir == path or git_dir in path.parents:
+            return None
+        common_dir = git_dir
+        if (git_dir / "commondir").is_file():
+            relative = (git_dir / "commondir").read_text().strip()
+            common_dir = (git_dir / relative).resolve()
+        if not _is_supported(git_dir, common_dir):
+            return None
+        return GitDirs(directory, git_dir, common_dir)
+    return None
+
+
+def _is_safe_ref_name(name: str) -> bool:
+    parts = name.split("/")
+    return not any(
+        not part or part.startswith(".") or part.endswith(".lock") for part in parts
+    ) and not any(character in name for character in ("..", "\\", "\0", "@{"))
+
+
+def read_packed_refs(dirs: GitDirs) -> Dict[str, str]:
+    """Map every ref of `packed-refs` to its sha."""
+    try:
+        with open(dirs.common_dir / "packed-refs", "r") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return {}
+    refs: Dict[str, str] = {}
+    for line in lines:
+        # Header and peeled tags
+        if line.startswith(("#", "^")):
+            continue
+        sha, _, name = line.partition(" ")
+        refs[name] = sha
+    return refs
+
+
+def read_ref(dirs: GitDirs, name: str) -> Optional[str]:
+    """Content of a ref, a sha or `ref: <target>`, `None` if it does not exist."""
+    if not _is_safe_ref_name(name):
+        return None
+    base = dirs.git_dir if name.startswith(PER_WORKTREE_REFS) else dirs.common_dir
+    try:
+        with open(base / name, "r") as f:
+            return f.read().strip()
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        return read_packed_refs(dirs).get(name)
+
+
+def list_refs(dirs: GitDirs, prefix: str) -> List[str]:
+    """Names of the refs under `prefix`, e.g. "refs/tags/", sorted like git."""
+    names = {name for name in read_packed_refs(dirs) if name.startswith(prefix)}
+    root = dirs.common_dir / prefix
+    for directory, _, filenames in os.walk(root):
+        relative = Path(directory).relative_to(dirs.common_dir).as_posix()
+        names.update(
+            f"{relative}/{filename}"
+            for filename in filenames
+            if not filename.endswith(".lock")
+        )
+    return sorted(names)
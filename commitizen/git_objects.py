@@ -0,0 +1,615 @@
+"""Read commits straight from `.git/objects`, without running git.
+
+Loose objects are inflated with zlib, packfiles are read through their
+memory-mapped `.idx` and `.pack` files, resolving deltas in process. The
+history is walked like `git log` does: newest commit date first and,
+for ranges, stopping once only excluded commits are left.
+
+Alternates, grafts, replace refs, partial clones and SHA-256 repositories
+are not supported, neither are revisions other than shas, refs and
+`start..end` ranges. `iter_commits` then falls back to `git.iter_commits`.
+"""
+import functools
+import heapq
+import mmap
+import re
+import zlib
+from collections import OrderedDict
+from itertools import count
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
+
+from commitizen import git, git_fs
+from commitizen.git import GitCommit
+
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+IDX_HEADER = b"\377tOc\0\0\0\2"
+FANOUT_SIZE = 256 * 4
+
+DELTA_BASE_CACHE_SIZE = 256
+
+# Commits walked past the newest excluded one, see `still_interesting` in git
+SLOP = 5
+
+FULL_SHA = re.compile(r"[0-9a-fA-F]{40}")
+
+PARENT_HEADER = re.compile(rb"^parent ([0-9a-f]{40})$", re.MULTILINE)
+COMMITTER_HEADER = re.compile(rb"^committer .* ([0-9]+) [+-][0-9]{4}$", re.MULTILINE)
+ENCODING_HEADER = re.compile(rb"^encoding (.+)$", re.MULTILINE)
+
+# Whitespace only lines, they end the subject paragraph
+BLANK_LINES = re.compile(r"(?:[^\S\n]*\n)*")
+PARAGRAPH_END = re.compile(r"\n[^\S\n]*(?:\n|\Z)")
+
+# `git rev-parse` lookup order for a short ref name
+REF_RULES = ("refs/{}", "refs/tags/{}", "refs/heads/{}", "refs/remotes/{}")
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Little endian base 128 number used in delta headers."""
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    _, position = _read_varint(delta, 0)
+    size, position = _read_varint(delta, position)
+    result = bytearray()
+    while position < len(delta):
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            offset = length = 0
+            for byte in range(4):
+                if opcode & (1 << byte):
+                    offset |= delta[position] << (8 * byte)
+                    position += 1
+            for byte in range(3):
+                if opcode & (0x10 << byte):
+                    length |= delta[position] << (8 * byte)
+                    position += 1
+            result += base[offset : offset + (length or 0x10000)]
+        elif opcode:
+            result += delta[position : position + opcode]
+            position += opcode
+        else:
+            raise ValueError("Invalid delta opcode")
+    if len(result) != size:
+        raise ValueError("Delta result size mismatch")
+    return bytes(result)
+
+
+def _map_file(path: Path) -> mmap.mmap:
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Pack:
+    """A packfile and its version 2 index, both memory-mapped."""
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.index = _map_file(index_path)
+        self.data = _map_file(index_path.with_suffix(".pack"))
+        if self.index[:8] != IDX_HEADER or self.data[:4] != b"PACK":
+            self.close()
+            raise ValueError(f"Unsupported pack {index_path}")
+        self.size = self._fanout(255)
+        self._shas = 8 + FANOUT_SIZE
+        # Shas are followed by their CRC32, then by the offsets
+        self._offsets = self._shas + self.size * 24
+        self._large_offsets = self._offsets + self.size * 4
+
+    def _fanout(self, byte: int) -> int:
+        if byte < 0:
+            return 0
+        start = 8 + byte * 4
+        return int.from_bytes(self.index[start : start + 4], "big")
+
+    def find(self, sha: bytes) -> Optional[int]:
+        """Offset of an object in the pack, `None` if it is not there."""
+        low, high = self._fanout(sha[0] - 1), self._fanout(sha[0])
+        while low < high:
+            middle = (low + high) // 2
+            start = self._shas + middle * 20
+            current = self.index[start : start + 20]
+            if current < sha:
+                low = middle + 1
+            elif current > sha:
+                high = middle
+            else:
+                return self._offset(middle)
+        return None
+
+    def _offset(self, position: int) -> int:
+        start = self._offsets + position * 4
+        offset = int.from_bytes(self.index[start : start + 4], "big")
+        if offset & 0x80000000:
+            start = self._large_offsets + (offset & 0x7FFFFFFF) * 8
+            offset = int.from_bytes(self.index[start : start + 8], "big")
+        return offset
+
+    def header(self, offset: int) -> Tuple[int, int, int]:
+        """Type, inflated size and data position of the object at `offset`."""
+        byte = self.data[offset]
+        object_type, size, shift = (byte >> 4) & 7, byte & 0x0F, 4
+        offset += 1
+        while byte & 0x80:
+            byte = self.data[offset]
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            offset += 1
+        return object_type, size, offset
+
+    def base_offset(self, offset: int, position: int) -> Tuple[int, int]:
+        """Decode the negative offset of an OFS_DELTA base."""
+        byte = self.data[position]
+        distance = byte & 0x7F
+        position += 1
+        while byte & 0x80:
+            byte = self.data[position]
+            distance = ((distance + 1) << 7) | (byte & 0x7F)
+            position += 1
+        return offset - distance, position
+
+    def inflate(self, position: int, size: int) -> bytes:
+        decompressor = zlib.decompressobj()
+        chunks = []
+        # zlib overhead, the loop covers incompressible data
+        chunk_size = size + 64
+        while not decompressor.eof:
+            chunk = self.data[position : position + chunk_size]
+            if not chunk:
+                raise ValueError("Truncated pack")
+            chunks.append(decompressor.decompress(chunk))
+            position += chunk_size
+        return b"".join(chunks)
+
+    def close(self):
+        self.index.close()
+        self.data.close()
+
+
+class ObjectStore:
+    """Objects of a repository, read from its loose objects and packfiles."""
+
+    def __init__(self, objects_dir: Path):
+        self.objects_dir = objects_dir
+        self._packs: Dict[Path, Pack] = {}
+        self._delta_bases: "OrderedDict[Tuple[Path, int], Tuple[int, bytes]]" = (
+            OrderedDict()
+        )
+        self._load_packs()
+
+    @classmethod
+    def open(cls, dirs: git_fs.GitDirs) -> Optional["ObjectStore"]:
+        """Open the store of a repository, `None` if it is not supported."""
+        objects_dir = dirs.common_dir / "objects"
+        config = (dirs.common_dir / "config").read_text().lower()
+        unsupported = (
+            objects_dir / "info" / "alternates",
+            dirs.common_dir / "info" / "grafts",
+        )
+        if (
+            any(path.exists() for path in unsupported)
+            or git_fs.list_refs(dirs, "refs/replace/")
+            or "objectformat" in config
+            or "promisor" in config
+        ):
+            return None
+        return cls(objects_dir)
+
+    def _load_packs(self):
+        for index_path in sorted((self.objects_dir / "pack").glob("*.idx")):
+            if index_path not in self._packs:
+                self._packs[index_path] = Pack(index_path)
+
+    def read(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        """Type and content of an object, `None` if it does not exist."""
+        binary_sha = bytes.fromhex(sha)
+        found = self._read_packed(binary_sha) or self._read_loose(sha)
+        if found is None:
+            # Objects may have been packed since the packs were listed
+            self._load_packs()
+            found = self._read_packed(binary_sha)
+        return found
+
+    def _read_loose(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        try:
+            with open(self.objects_dir / sha[:2] / sha[2:], "rb") as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        header, _, content = raw.partition(b"\0")
+        object_type, _ = header.decode().split(" ")
+        return object_type, content
+
+    def _read_packed(self, sha: bytes) -> Optional[Tuple[str, bytes]]:
+        for pack in self._packs.values():
+            offset = pack.find(sha)
+            if offset is not None:
+                return self._read_pack_object(pack, offset)
+        return None
+
+    def _read_pack_object(self, pack: Pack, offset: int) -> Tuple[str, bytes]:
+        # Deltas are collected down to their base, then applied in reverse
+        deltas: List[bytes] = []
+        while True:
+            cached = self._delta_bases.get((pack.index_path, offset))
+            if cached is not None:
+                self._delta_bases.move_to_end((pack.index_path, offset))
+                object_type, content = cached
+                break
+            object_type, size, position = pack.header(offset)
+            if object_type == OFS_DELTA:
+                offset, position = pack.base_offset(offset, position)
+                deltas.append(pack.inflate(position, size))
+            elif object_type == REF_DELTA:
+                base_sha = pack.data[position : position + 20]
+                deltas.append(pack.inflate(position + 20, size))
+                base = self.read(base_sha.hex())
+                if base is None:
+                    raise ValueError(f"Missing delta base {base_sha.hex()}")
+                type_name, content = base
+                object_type = next(
+                    code for code, name in OBJECT_TYPES.items() if name == type_name
+                )
+                break
+            else:
+                content = pack.inflate(position, size)
+                if deltas:
+                    self._cache_delta_base(pack, offset, object_type, content)
+                break
+        for delta in reversed(deltas):
+            content = apply_delta(content, delta)
+        return OBJECT_TYPES[object_type], content
+
+    def _cache_delta_base(self, pack: Pack, offset: int, object_type, content):
+        self._delta_bases[(pack.index_path, offset)] = (object_type, content)
+        if len(self._delta_bases) > DELTA_BASE_CACHE_SIZE:
+            self._delta_bases.popitem(last=False)
+
+    def close(self):
+        for pack in self._packs.values():
+            pack.close()
+        self._packs.clear()
+        self._delta_bases.clear()
+
+
+def parse_commit_header(content: bytes) -> Tuple[List[str], int]:
+    """Parents and committer timestamp of a commit object."""
+    raw_headers = content.partition(b"\n\n")[0]
+    parents = [parent.decode() for parent in PARENT_HEADER.findall(raw_headers)]
+    committer = COMMITTER_HEADER.search(raw_headers)
+    return parents, int(committer.group(1)) if committer else 0
+
+
+def parse_commit(content: bytes) -> Tuple[List[str], int, str, str]:
+    """Parents, committer timestamp, subject and body of a commit object.
+
+    Subject and body follow `%s` and `%b`: the subject is the first
+    paragraph joined on a single line.
+    """
+    parents, timestamp = parse_commit_header(content)
+    raw_headers, _, raw_message = content.partition(b"\n\n")
+    encoding = ENCODING_HEADER.search(raw_headers)
+    try:
+        message = raw_message.decode(
+            encoding.group(1).decode() if encoding else "utf-8", errors="replace"
+        )
+    except LookupError:
+        message = raw_message.decode(errors="replace")
+
+    # Leading blank lines are skipped, like the ones after the subject
+    message = message[BLANK_LINES.match(message).end() :]  # type: ignore
+    paragraph_end = PARAGRAPH_END.search(message)
+    if paragraph_end:
+        subject, body = message[: paragraph_end.start()], message[paragraph_end.end() :]
+        body = body[BLANK_LINES.match(body).end() :]  # type: ignore
+    else:
+        subject, body = message, ""
+    if "\n" in subject:
+        subject = " ".join(line.rstrip() for line in subject.split("\n"))
+    return parents, timestamp, subject.rstrip(), body
+
+
+class Repository:
+    """Resolve revisions and walk the history of a repository natively."""
+
+    def __init__(self, dirs: git_fs.GitDirs, store: ObjectStore):
+        self.dirs = dirs
+        self.store = store
+        self.shallow: Set[str] = set()
+        shallow_file = dirs.common_dir / "shallow"
+        if shallow_file.exists():
+            self.shallow = set(shallow_file.read_text().split())
+
+    @classmethod
+    def open(cls, cwd: Optional[str] = None) -> Optional["Repository"]:
+        dirs = git_fs.discover(cwd)
+        if dirs is None:
+            return None
+        store = ObjectStore.open(dirs)
+        if store is None:
+            return None
+        return cls(dirs, store)
+
+    def close(self):
+        self.store.close()
+
+    def _read_ref(self, name: str) -> Optional[str]:
+        """Follow symbolic refs down to a sha."""
+        for _ in range(5):
+            value = git_fs.read_ref(self.dirs, name)
+            if value is None or not value.startswith("ref: "):
+                return value
+            name = value[5:]
+        return None
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Sha of the commit a sha or ref points to, peeling annotated tags."""
+        if FULL_SHA.fullmatch(rev):
+            sha: Optional[str] = rev.lower()
+        elif rev == "HEAD":
+            sha = self._read_ref("HEAD")
+        elif rev.isupper() or rev.startswith(("-", "^", ":")) or "@" in rev:
+            # FETCH_HEAD, reflogs, searches...
+            return None
+        else:
+            sha = next(
+                filter(None, (self._read_ref(rule.format(rev)) for rule in REF_RULES)),
+                None,
+            )
+        while sha is not None:
+            git_object = self.store.read(sha)
+            if git_object is None:
+                return None
+            object_type, content = git_object
+            if object_type == "commit":
+                return sha
+            if object_type != "tag":
+                return None
+            sha = content[7:47].decode()
+        return None
+
+    def _read_commit_object(self, sha: str) -> bytes:
+        git_object = self.store.read(sha)
+        if git_object is None or git_object[0] != "commit":
+            raise ValueError(f"Missing commit {sha}")
+        return git_object[1]
+
+    def read_commit(self, sha: str) -> Tuple[List[str], int, str, str]:
+        parents, timestamp, subject, body = parse_commit(self._read_commit_object(sha))
+        # The history of a shallow clone stops at its boundary commits
+        if sha in self.shallow:
+            parents = []
+        return parents, timestamp, subject, body
+
+    def read_commit_header(self, sha: str) -> Tuple[List[str], int]:
+        """Parents and timestamp of a commit, its message is not decoded."""
+        parents, timestamp = parse_commit_header(self._read_commit_object(sha))
+        if sha in self.shallow:
+            parents = []
+        return parents, timestamp
+
+    def walk(self, include: List[str], exclude: List[str]) -> Iterator[GitCommit]:
+        """Commits reachable from `include` but not from `exclude`, like git log."""
+        return _Walk(self).run(include, exclude)
+
+
+class _Walk:
+    """A single history walk, ordered by commit date like `git log`."""
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+        self.queue: List[Tuple[int, int, str]] = []
+        self.order = count()
+        self.seen: Set[str] = set()
+        self.uninteresting: Set[str] = set()
+        self.parents: Dict[str, List[str]] = {}
+        # Messages of the commits queued by an unlimited walk
+        self.messages: Dict[str, Tuple[str, str]] = {}
+        self.limited = False
+
+    def _parse(self, sha: str) -> int:
+        if self.limited:
+            # Most commits walked while limiting are never yielded
+            self.parents[sha], timestamp = self.repository.read_commit_header(sha)
+            return timestamp
+        parents, timestamp, subject, body = self.repository.read_commit(sha)
+        self.parents[sha] = parents
+        self.messages[sha] = (subject, body)
+        return timestamp
+
+    def _push(self, sha: str):
+        if sha in self.seen:
+            return
+        self.seen.add(sha)
+        # Same dates keep their insertion order
+        heapq.heappush(self.queue, (-self._parse(sha), next(self.order), sha))
+
+    def _mark_uninteresting(self, sha: str):
+        """Exclude a commit and every ancestor already walked through."""
+        pending = [sha]
+        while pending:
+            current = pending.pop()
+            if current in self.uninteresting:
+                continue
+            self.uninteresting.add(current)
+            pending.extend(self.parents.get(current, []))
+
+    def _commit(self, sha: str) -> GitCommit:
+        if self.limited:
+            _, _, subject, body = self.repository.read_commit(sha)
+        else:
+            subject, body = self.messages.pop(sha)
+        return GitCommit(rev=sha, title=subject, body=body)
+
+    def run(self, include: List[str], exclude: List[str]) -> Iterator[GitCommit]:
+        self.limited = bool(exclude)
+        for sha in exclude:
+            self._push(sha)
+            self._mark_uninteresting(sha)
+        for sha in include:
+            self._push(sha)
+        if not exclude:
+            # Nothing to exclude, commits are yielded as they are walked
+            while self.queue:
+                _, _, sha = heapq.heappop(self.queue)
+                for parent in self.parents.pop(sha):
+                    self._push(parent)
+                yield self._commit(sha)
+            return
+        for sha in self._limit():
+            if sha not in self.uninteresting:
+                yield self._commit(sha)
+
+    def _limit(self) -> List[str]:
+        """Walk until only excluded commits are left, see `limit_list` in git."""
+        walked: List[str] = []
+        newest_included = None
+        slop = SLOP
+        while self.queue:
+            negative_timestamp, _, sha = heapq.heappop(self.queue)
+            is_uninteresting = sha in self.uninteresting
+            for parent in self.parents[sha]:
+                self._push(parent)
+                if is_uninteresting:
+                    self._mark_uninteresting(parent)
+            if not is_uninteresting:
+                newest_included = -negative_timestamp
+                walked.append(sha)
+                continue
+            slop = self._still_interesting(newest_included, slop)
+            if not slop:
+                break
+        return walked
+
+    def _still_interesting(self, timestamp: Optional[int], slop: int) -> int:
+        if not self.queue:
+            return 0
+        if timestamp is not None and timestamp <= -self.queue[0][0]:
+            return SLOP
+        if any(sha not in self.uninteresting for _, _, sha in self.queue):
+            return SLOP
+        return slop - 1
+
+
+def _parse_range(
+    repository: Repository, start: Optional[str], end: str
+) -> Optional[Tuple[List[str], List[str]]]:
+    """Resolve `start..end` (or an `a..b` end) into included and excluded shas."""
+    if start is None and ".." in end:
+        if "..." in end:
+            return None
+        start, _, end = end.partition("..")
+        start, end = start or "HEAD", end or "HEAD"
+    include = repository.resolve(end)
+    exclude = repository.resolve(start) if start else None
+    if include is None or (start and exclude is None):
+        return None
+    return [include], [exclude] if exclude else []
+
+
+def iter_commits(
+    start: Optional[str] = None,
+    end: str = "HEAD",
+    *,
+    pathspecs: Sequence[str] = (),
+    filters: Sequence[str] = (),
+) -> Iterator[GitCommit]:
+    """
+    Yield the commits between start and end, like `git.iter_commits`
+
+    Falls back to `git.iter_commits` when the repository or the revisions
+    are not supported, and for `pathspecs` and `filters` which only git
+    implements.
+    """
+    if pathspecs or filters:
+        yield from git.iter_commits(start, end, pathspecs=pathspecs, filters=filters)
+        return
+    repository = Repository.open()
+    revisions = repository and _parse_range(repository, start, end)
+    if repository is None or not revisions:
+        if repository:
+            repository.close()
+        yield from git.iter_commits(start, end)
+        return
+    try:
+        yield from repository.walk(*revisions)
+    finally:
+        repository.close()
+
+
+def get_commits(start: Optional[str] = None, end: str = "HEAD") -> List[GitCommit]:
+    """Same as `git.get_commits`, reading `.git/objects` directly."""
+    return list(iter_commits(start, end))
+
+
+def commit_iterator(
+    settings: dict, lazy: bool = False, jobs: int = 1
+) -> Callable[..., Iterator]:
+    """The `iter_commits` selected by the `native_object_reader` setting.
+
+    With `lazy`, git only lists the commits and messages are read on use.
+    With `subject_only`, commits come without their body. More than one job
+    reads big ranges with several git processes instead.
+    """
+    if jobs > 1:
+        iterator: Callable[..., Iterator] = functools.partial(
+            git.iter_commits_parallel, jobs=jobs
+        )
+    elif settings.get("native_object_reader"):
+        iterator = iter_commits
+    elif lazy and settings.get("subject_only"):
+        # Wrapped, every subject would be read before the cache is checked
+        return functools.partial(git.iter_lazy_commits, subject_only=True)
+    elif lazy:
+        iterator = git.iter_lazy_commits
+    elif settings.get("subject_only"):
+        return git.iter_subjects
+    else:
+        return git.iter_commits
+    return _subjects_only(iterator) if settings.get("subject_only") else iterator
+
+
+def _subjects_only(iterator: Callable[..., Iterator]) -> Callable[..., Iterator]:
+    def iter_subjects(*args, **kwargs) -> Iterator[GitCommit]:
+        commits = cast(Generator, iterator(*args, **kwargs))
+        try:
+            for commit in commits:
+                yield GitCommit(commit.rev, commit.title)
+        finally:
+            commits.close()
+
+    return iter_subjects
+
+
+def walk_filters(settings: dict) -> List[str]:
+    """`git log` options of the `first_parent` and `no_merges` settings."""
+    filters = []
+    if settings.get("first_parent"):
+        filters.append("--first-parent")
+    if settings.get("no_merges"):
+        filters.append("--no-merges")
+    return filters
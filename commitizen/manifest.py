@@ -0,0 +1,213 @@
+"""Find the value of a key in JSON, TOML and YAML files, as a byte span.
+
+Version files like `package.json#version` or
+`pyproject.toml#tool.poetry.version` are updated in place. A tokenizer skips
+through the file, without building the document, up to the value of the key.
+Only scalar values can be found, keys under arrays cannot be addressed.
+"""
+import mmap
+import os
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Pattern, Tuple, Union
+
+Content = Union[bytes, mmap.mmap]
+Span = Tuple[int, int]
+
+SPACE = re.compile(rb"\s*")
+
+JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.S)
+JSON_LITERAL = re.compile(rb"[^\s,:\[\]{}]+")
+
+TOML_SPACE = re.compile(rb"(?:\s|#[^\n]*)*")
+TOML_KEY_PART = re.compile(rb'[A-Za-z0-9_-]+|"(?:[^"\\\n]|\\.)*"|\'[^\'\n]*\'')
+TOML_KEY = re.compile(
+    rb"(?:%s)(?:[ \t]*\.[ \t]*(?:%s))*" % (TOML_KEY_PART.pattern, TOML_KEY_PART.pattern)
+)
+TOML_TABLE = re.compile(rb"\[(\[)?[ \t]*(%s)[ \t]*\]\]?" % TOML_KEY.pattern)
+TOML_ASSIGNMENT = re.compile(rb"(%s)[ \t]*=[ \t]*" % TOML_KEY.pattern)
+TOML_SCALAR = re.compile(
+    rb'"""(?:[^\\]|\\.)*?"""(?:"{0,2})'
+    rb"|'''.*?'''(?:'{0,2})"
+    rb'|"(?:[^"\\\n]|\\.)*"'
+    rb"|'[^'\n]*'"
+    rb"|[^\s#,\[\]{}](?:[^\n#,\]}]*[^\s#,\]}])?",
+    re.S,
+)
+# Strings and comments are skipped whole, they can contain brackets
+TOML_NESTED = re.compile(
+    rb'"""(?:[^\\]|\\.)*?"""(?:"{0,2})'
+    rb"|'''.*?'''(?:'{0,2})"
+    rb'|"(?:[^"\\\n]|\\.)*"'
+    rb"|'[^'\n]*'"
+    rb"|#[^\n]*"
+    rb"|[\[\]{}]",
+    re.S,
+)
+
+YAML_KEY = re.compile(
+    rb'("(?:[^"\\\n]|\\.)*"|\'(?:[^\'\n]|\'\')*\'|[^\s#"\'{}\[\]-][^\n]*?'
+    rb"|-[^\s][^\n]*?)[ \t]*:(?=[ \t\r\n]|$)[ \t]*"
+)
+YAML_SCALAR = re.compile(
+    rb'"(?:[^"\\\n]|\\.)*"'
+    rb"|'(?:[^'\n]|'')*'"
+    rb"|[^\s#&*!|>{}\[\]](?:[^\r\n#]|(?<=[^ \t])#)*"
+)
+
+
+def find_value(content: Content, filename: str, key: str) -> Span:
+    """Span of the value of a dotted `key`, strings keep their quotes."""
+    extension = os.path.splitext(filename)[1].lower()
+    finder = FINDERS.get(extension)
+    if finder is None:
+        raise ValueError("Keys can only be found in JSON, TOML and YAML files")
+    span = finder(content, key.split("."))
+    if span is None:
+        raise ValueError(f"Could not find a value for {key} in {filename}")
+    return span
+
+
+def _skip(pattern: Pattern, content: Content, position: int, end: int = -1) -> int:
+    """Position after the characters `pattern` matches, which can be none."""
+    match = pattern.match(content, position, len(content) if end == -1 else end)
+    return match.end() if match else position
+
+
+def _unquote(key: bytes) -> str:
+    if key[:1] in (b'"', b"'") and key[-1:] == key[:1]:
+        key = key[1:-1]
+    return key.decode("utf-8", "surrogateescape")
+
+
+def find_json_value(content: Content, path: List[str]) -> Optional[Span]:
+    # Key of every enclosing object, `None` for arrays
+    keys: List[Optional[str]] = []
+    expect_key = False
+    position = 0
+    while True:
+        position = _skip(SPACE, content, position)
+        token = content[position : position + 1]
+        if not token:
+            return None
+        if token in b"{[":
+            keys.append("" if token == b"{" else None)
+            expect_key = token == b"{"
+        elif token in b"}]":
+            keys.pop()
+            expect_key = False
+        elif token == b",":
+            expect_key = bool(keys) and keys[-1] is not None
+        elif token != b":":
+            match = (JSON_STRING if token == b'"' else JSON_LITERAL).match(
+                content, position
+            )
+            if not match:
+                return None
+            if expect_key:
+                keys[-1] = _unquote(match.group())
+                expect_key = False
+            elif keys == path:
+                return match.span()
+            position = match.end()
+            continue
+        position += 1
+
+
+def _toml_key(key: bytes) -> List[str]:
+    return [_unquote(part.group()) for part in TOML_KEY_PART.finditer(key)]
+
+
+def _skip_toml_nested(content: Content, position: int) -> int:
+    """End of the array or inline table starting at `position`."""
+    depth = 0
+    for token in TOML_NESTED.finditer(content, position):
+        if token.group() in (b"[", b"{"):
+            depth += 1
+        elif token.group() in (b"]", b"}"):
+            depth -= 1
+            if not depth:
+                return token.end()
+    return len(content)
+
+
+def find_toml_value(content: Content, path: List[str]) -> Optional[Span]:
+    # Keys of the current table, `None` in an array of tables
+    table: Optional[List[str]] = []
+    position = 0
+    while True:
+        position = _skip(TOML_SPACE, content, position)
+        if position >= len(content):
+            return None
+        header = TOML_TABLE.match(content, position)
+        if header:
+            table = None if header.group(1) else _toml_key(header.group(2))
+            position = header.end()
+            continue
+        assignment = TOML_ASSIGNMENT.match(content, position)
+        if not assignment:
+            return None
+        position = assignment.end()
+        if table is not None and table + _toml_key(assignment.group(1)) == path:
+            scalar = TOML_SCALAR.match(content, position)
+            return scalar.span() if scalar else None
+        if content[position : position + 1] in (b"[", b"{"):
+            position = _skip_toml_nested(content, position)
+        else:
+            scalar = TOML_SCALAR.match(content, position)
+            position = scalar.end() if scalar else position + 1
+
+
+def _yaml_lines(content: Content) -> Iterator[Tuple[int, int, int]]:
+    """Indentation, start and end of the lines holding something."""
+    position = 0
+    while position < len(content):
+        end = content.find(b"\n", position)
+        end = len(content) if end == -1 else end
+        start = _skip(SPACE, content, position, end)
+        if start < end and content[start : start + 1] != b"#":
+            yield start - position, start, end
+        position = end + 1
+
+
+def find_yaml_value(content: Content, path: List[str]) -> Optional[Span]:
+    # Indentation and key of the enclosing mappings, `None` for sequences
+    parents: List[Tuple[int, Optional[str]]] = []
+    block_indent = -1
+    for indent, start, end in _yaml_lines(content):
+        # Lines of a literal or folded scalar are more indented than its key
+        if indent > block_indent >= 0:
+            continue
+        block_indent = -1
+        if content[start : start + 3] in (b"---", b"..."):
+            parents = []
+            continue
+        while parents and parents[-1][0] >= indent:
+            parents.pop()
+        if content[start : start + 2].rstrip() == b"-":
+            parents.append((indent, None))
+            continue
+        key = YAML_KEY.match(content, start, end)
+        if not key:
+            continue
+        keys = [parent for _, parent in parents] + [_unquote(key.group(1))]
+        value = content[key.end() : end].strip()
+        if keys == path:
+            scalar = YAML_SCALAR.match(content, key.end(), end)
+            return (
+                (scalar.start(), scalar.start() + len(scalar.group().rstrip()))
+                if scalar
+                else None
+            )
+        if not value or value.startswith(b"#"):
+            parents.append((indent, keys[-1]))
+        elif value[:1] in b"|>":
+            block_indent = indent
+    return None
+
+
+FINDERS: Dict[str, Callable[[Content, List[str]], Optional[Span]]] = {
+    ".json": find_json_value,
+    ".toml": find_toml_value,
+    ".yaml": find_yaml_value,
+    ".yml": find_yaml_value,
+}
@@ -0,0 +1,136 @@
+"""Bump several packages of one repository from a single pass over the history.
+
+Packages are configured by path, each with its own version, tag and files:
+
+```toml
+[tool.commitizen.packages.core]
+path = "packages/core"
+version = "1.2.0"
+tag_format = "core-v$version"
+version_files = ["packages/core/__init__.py"]
+```
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from packaging.version import Version
+
+from commitizen import bump, git
+from commitizen.git import GitCommit
+
+
+class Package(NamedTuple):
+    name: str
+    path: str
+    version: str
+    tag_format: str
+    version_files: List[str]
+
+    @property
+    def tag(self) -> str:
+        return bump.create_tag(self.version, tag_format=self.tag_format)
+
+
+class Release(NamedTuple):
+    package: Package
+    increment: Optional[str]
+    new_version: Version
+
+    @property
+    def new_tag(self) -> str:
+        return bump.create_tag(self.new_version, tag_format=self.package.tag_format)
+
+
+def _normalize_path(path: str) -> str:
+    """Path relative to the root as `git log` prints it, "" for the root."""
+    parts = [part for part in path.split("/") if part not in ("", ".")]
+    return "/".join(parts)
+
+
+def load_packages(settings: dict) -> List[Package]:
+    """Packages of the `packages` setting, tagged `<name>-$version` by default.
+
+    Raises `ValueError` when a package misses its `path` or `version`.
+    """
+    for name, package in settings["packages"].items():
+        missing = [key for key in ("path", "version") if key not in package]
+        if missing:
+            raise ValueError(f"Package {name} has no {' or '.join(missing)}")
+    return [
+        Package(
+            name=name,
+            path=_normalize_path(package["path"]),
+            version=str(package["version"]),
+            tag_format=package.get("tag_format") or f"{name}-$version",
+            version_files=list(package.get("version_files", [])),
+        )
+        for name, package in settings["packages"].items()
+    ]
+
+
+class _PathIndex:
+    """Find the packages owning a path by looking up its parent directories."""
+
+    def __init__(self, packages: Iterable[Package]):
+        self._by_path: Dict[str, List[str]] = {}
+        for package in packages:
+            self._by_path.setdefault(package.path, []).append(package.name)
+
+    def owners(self, path: str) -> Set[str]:
+        owners: Set[str] = set(self._by_path.get("", []))
+        while path:
+            owners.update(self._by_path.get(path, []))
+            path = path.rpartition("/")[0]
+        return owners
+
+
+def find_package_commits(
+    packages: List[Package], initial: Set[str]
+) -> Dict[str, List[GitCommit]]:
+    """Commits of every package since its tag, from a single `git log`.
+
+    The log covers HEAD and every tag, down to their common ancestor.
+    Going from children to parents, each commit collects a bit per tip it
+    is reachable from. A package gets the commits reachable from HEAD and
+    not from its tag which change a file under its path. Packages listed in
+    `initial` have no tag yet, so the whole history is read for them.
+    """
+    tagged = [package for package in packages if package.name not in initial]
+    shas = git.rev_parse_commits(["HEAD", *(package.tag for package in tagged)])
+    if not shas:
+        return {package.name: [] for package in packages}
+    head, tag_shas = shas[0], shas[1:]
+
+    tips: Dict[str, int] = {head: 1}
+    tag_bits: Dict[str, int] = {}
+    for bit, (package, sha) in enumerate(zip(tagged, tag_shas), start=1):
+        tips[sha] = tips.get(sha, 0) | 1 << bit
+        tag_bits[package.name] = 1 << bit
+    base = None if initial else git.merge_base_octopus(tag_shas)
+
+    path_index = _PathIndex(packages)
+    commits: Dict[str, List[GitCommit]] = {package.name: [] for package in packages}
+    inherited: Dict[str, int] = {}
+    for commit, parents, paths in git.iter_commits_with_paths(
+        list(tips), [base] if base else []
+    ):
+        mask = tips.get(commit.rev, 0) | inherited.pop(commit.rev, 0)
+        for parent in parents:
+            inherited[parent] = inherited.get(parent, 0) | mask
+        if not mask & 1:
+            continue
+        owners = set().union(*(path_index.owners(path) for path in paths))
+        for name in owners:
+            if not mask & tag_bits.get(name, 0):
+                commits[name].append(commit)
+    return commits
+
+
+def create_commit_message(releases: List[Release]) -> str:
+    title = ", ".join(
+        f"{release.package.name} {release.new_version}" for release in releases
+    )
+    body = "\n".join(
+        f"{release.package.name}: {release.package.version} → {release.new_version}"
+        for release in releases
+    )
+    return f"bump: {title}\n\n{body}"
@@ -0,0 +1,161 @@
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Union
+
+from packaging.version import InvalidVersion, Version
+
+from commitizen import git
+
+# Loose on purpose, packaging decides what is a valid version
+VERSION_REGEX = r"[0-9][0-9A-Za-z.!+_-]*?"
+
+TAG_FORMAT_VARIABLES = {
+    "version": VERSION_REGEX,
+    "major": r"[0-9]+",
+    "minor": r"[0-9]+",
+    "patch": r"[0-9]+",
+    "prerelease": r"(?:a|b|rc)[0-9]+|",
+}
+
+GLOB_SPECIAL = re.compile(r"[\\*?\[]")
+
+TEMPLATE_PLACEHOLDER = re.compile(
+    r"\$(?:(?P<escaped>\$)|(?P<named>\w+)|{(?P<braced>\w+)})"
+)
+
+
+def tag_format_regex(tag_format: str) -> Pattern:
+    """Compile a `tag_format` into the regex parsing the tags it creates.
+
+    Example:
+        "v$major.$minor.$patch$prerelease" -> r"^v(?P<major>[0-9]+)\\.(...)$"
+    """
+    regex = ""
+    seen: Set[str] = set()
+    position = 0
+    for placeholder in TEMPLATE_PLACEHOLDER.finditer(tag_format):
+        regex += re.escape(tag_format[position : placeholder.start()])
+        position = placeholder.end()
+        name = placeholder.group("named") or placeholder.group("braced")
+        if placeholder.group("escaped") or name not in TAG_FORMAT_VARIABLES:
+            # Left untouched by `bump.create_tag`
+            regex += re.escape(placeholder.group(0).replace("$$", "$"))
+        elif name in seen:
+            regex += f"(?P={name})"
+        else:
+            seen.add(name)
+            regex += f"(?P<{name}>{TAG_FORMAT_VARIABLES[name]})"
+    regex += re.escape(tag_format[position:])
+    return re.compile(f"^{regex}$")
+
+
+def tag_format_glob(tag_format: str) -> str:
+    """Glob matching every tag created with `tag_format`, e.g. "v$version" -> "v*".
+
+    Meant for `git describe --match`, it is looser than `tag_format_regex`.
+    """
+    glob = ""
+    position = 0
+    for placeholder in TEMPLATE_PLACEHOLDER.finditer(tag_format):
+        glob += GLOB_SPECIAL.sub(r"\\\g<0>", tag_format[position : placeholder.start()])
+        position = placeholder.end()
+        name = placeholder.group("named") or placeholder.group("braced")
+        if placeholder.group("escaped") or name not in TAG_FORMAT_VARIABLES:
+            literal = placeholder.group(0).replace("$$", "$")
+            glob += GLOB_SPECIAL.sub(r"\\\g<0>", literal)
+        else:
+            glob += "*"
+    return glob + GLOB_SPECIAL.sub(r"\\\g<0>", tag_format[position:])
+
+
+def find_current_tag(tag_format: Optional[str] = None) -> Optional[str]:
+    """Latest tag reachable from HEAD that `tag_format` could have created.
+
+    `git describe --match` finds it without listing every tag, the tags
+    reachable from HEAD are only indexed when the glob matched another tag.
+    """
+    tag_format = tag_format or "$version"
+    tag = git.get_latest_tag_name(pattern=tag_format_glob(tag_format))
+    if tag is None:
+        return None
+    index = TagIndex([tag], tag_format)
+    if index.version_of(tag):
+        return tag
+    return TagIndex(git.get_tag_names(merged="HEAD") or [], tag_format).latest()
+
+
+class TagIndex:
+    """Every tag of the repository, parsed into a version once.
+
+    Existence checks are O(1) and "latest version below" lookups O(log n).
+    With a `tag_format` only the tags it could have created have a version,
+    without it any tag `packaging` can parse (e.g. `v1.0.0`) has one.
+    """
+
+    def __init__(self, tags: Iterable[str], tag_format: Optional[str] = None):
+        self.tag_format = tag_format
+        self._regex = tag_format_regex(tag_format) if tag_format else None
+        self._tags: Dict[str, Optional[Version]] = {
+            tag: self.parse(tag) for tag in tags
+        }
+        versioned = sorted(
+            (version, tag) for tag, version in self._tags.items() if version
+        )
+        self._versions: List[Version] = [version for version, _ in versioned]
+        self._versioned_tags: List[str] = [tag for _, tag in versioned]
+
+    @classmethod
+    def from_git(cls, tag_format: Optional[str] = None) -> "TagIndex":
+        """Build the index from a single `git tag --list` call."""
+        return cls(git.get_tag_names() or [], tag_format)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._tags
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def parse(self, tag: str) -> Optional[Version]:
+        """Return the version of a tag, `None` if it does not have one."""
+        if self._regex is None:
+            try:
+                return Version(tag)
+            except InvalidVersion:
+                return None
+
+        match = self._regex.match(tag)
+        if not match:
+            return None
+        values = match.groupdict()
+        if values.get("version"):
+            version = values["version"]
+        elif values.get("major") is not None:
+            version = (
+                f"{values['major']}.{values.get('minor') or 0}."
+                f"{values.get('patch') or 0}{values.get('prerelease') or ''}"
+            )
+        else:
+            return None
+        try:
+            return Version(version)
+        except InvalidVersion:
+            return None
+
+    def version_of(self, tag: str) -> Optional[Version]:
+        return self._tags.get(tag)
+
+    def latest(self) -> Optional[str]:
+        """Tag of the highest version."""
+        return self._versioned_tags[-1] if self._versioned_tags else None
+
+    def latest_below(self, version: Union[str, Version]) -> Optional[str]:
+        """Tag of the highest version strictly lower than `version`."""
+        if isinstance(version, str):
+            version = Version(version)
+        position = bisect_left(self._versions, version)
+        return self._versioned_tags[position - 1] if position else None
+
+    def names(self) -> List[str]:
+        """Tags from the highest version down, tags without a version last."""
+        unversioned = sorted(tag for tag, version in self._tags.items() if not version)
+        return self._versioned_tags[::-1] + unversioned
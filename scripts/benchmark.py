@@ -0,0 +1,100 @@
+"""Timings quoted by the commits that made git access faster.
+
+Run from the root of a git repository, e.g.
+
+    poetry run python scripts/benchmark.py object-reader
+"""
+import argparse
+import re
+import time
+from typing import Callable, Dict, List
+
+from commitizen import bump, cmd, git
+from commitizen.defaults import bump_map, bump_pattern
+
+
+def timed(label: str, function: Callable[[], object], repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    print(f"{label}: {time.perf_counter() - start:.3f}s")
+
+
+def object_reader(args: argparse.Namespace):
+    """Lookups of a commit through one process each, then the object reader."""
+    rev = args.rev
+    timed(
+        f"cmd.run('git cat-file -p {rev}') x{args.repeat}",
+        lambda: cmd.run(["git", "cat-file", "-p", rev]),
+        args.repeat,
+    )
+    timed(
+        f"git.get_commit({rev!r}) x{args.repeat}",
+        lambda: git.get_commit(rev),
+        args.repeat,
+    )
+    git.close_object_readers()
+
+
+def find_increment_per_entry(commits: List[git.GitCommit]):
+    """`find_increment` before the classifier: `re.match` per map entry."""
+    select_pattern = re.compile(bump_pattern)
+    increment = None
+    for commit in commits:
+        for message in commit.message.split("\n"):
+            result = select_pattern.search(message)
+            if result:
+                new_increment = None
+                for match_pattern, map_increment in bump_map.items():
+                    if re.match(match_pattern, result.group(0)):
+                        new_increment = map_increment
+                        break
+                increment = bump.merge_increment(increment, new_increment)
+    return increment
+
+
+def classifier(args: argparse.Namespace):
+    """Synthetic subjects without a MAJOR increment, so all of them are read."""
+    subjects = ["fix(cli): a", "docs: b", "refactor(bump): c", "chore: d"]
+    commits = [
+        git.GitCommit(rev="0", title=subjects[i % len(subjects)])
+        for i in range(args.count)
+    ]
+    timed(
+        f"re.match per bump_map entry, {args.count} subjects",
+        lambda: find_increment_per_entry(commits),
+    )
+    timed(
+        f"IncrementClassifier, {args.count} subjects",
+        lambda: bump.find_increment(commits, classifier=bump.IncrementClassifier()),
+    )
+
+
+def parallel_log(args: argparse.Namespace):
+    """Every commit of `--rev` read by one git process, then by several."""
+    for jobs in (1, 2, 4):
+        timed(
+            f"git.iter_commits_parallel(jobs={jobs})",
+            lambda: list(git.iter_commits_parallel(end=args.rev, jobs=jobs)),
+        )
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], None]] = {
+    "object-reader": object_reader,
+    "classifier": classifier,
+    "parallel-log": parallel_log,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("--rev", default="HEAD", help="revision to look up")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from typing import Optional
 import pytest
 
 from commitizen import cli, cmd, git
+from commitizen.error_codes import INVALID_VERSION_FILE
 
 
 def create_file_and_commit(message: str, filename: Optional[str] = None):
@@ -118,3 +119,292 @@ def test_bump_when_not_new_commit(mocker, capsys):
     expected_error_message = "[NO_COMMITS_FOUND]\n" "No new commits found."
     _, err = capsys.readouterr()
     assert expected_error_message in err
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_with_commit_cache(mocker):
+    with open("pyproject.toml", "a") as f:
+        f.write("\ncommit_cache = true\n")
+    create_file_and_commit("feat: new file")
+
+    testargs = ["cz", "bump", "--yes"]
+    mocker.patch.object(sys, "argv", testargs)
+    cli.main()
+    assert git.tag_exist("0.2.0") is True
+    assert Path(".git/commitizen/commits.sqlite").exists()
+
+    create_file_and_commit("fix: username exception")
+    testargs = ["cz", "bump"]
+    mocker.patch.object(sys, "argv", testargs)
+    cli.main()
+    assert git.tag_exist("0.2.1") is True
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_bump_with_scm_version(mocker):
+    with open("pyproject.toml", "w") as f:
+        f.write(
+            "[tool.commitizen]\n"
+            'version_provider = "scm"\n'
+            'tag_format = "v$version"\n'
+        )
+    create_file_and_commit("feat: new file")
+    git.tag("v0.1.0")
+    git.tag("nightly")
+    create_file_and_commit("feat: new user interface")
+
+    testargs = ["cz", "bump", "--yes"]
+    mocker.patch.object(sys, "argv", testargs)
+    cli.main()
+
+    assert git.tag_exist("v0.2.0") is True
+    with open("pyproject.toml") as f:
+        assert "version =" not in f.read()
+    # Nothing to commit, the new tag points at the last commit
+    assert git.get_commits(start="v0.2.0") == []
+    assert git.get_commits(start="v0.1.0")[0].title == "feat: new user interface"
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_bump_with_scm_version_without_tag(mocker, capsys):
+    with open("pyproject.toml", "w") as f:
+        f.write("[tool.commitizen]\n" 'version_provider = "scm"\n')
+    create_file_and_commit("feat: new file")
+
+    mocker.patch.object(sys, "argv", ["cz", "bump", "--yes"])
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    _, err = capsys.readouterr()
+    assert "No tag matching tag_format was found" in err
+    assert "git tag 0.1.0" in err
+
+
+def create_packages():
+    with open("pyproject.toml", "w") as f:
+        f.write(
+            "[tool.commitizen.packages.core]\n"
+            'path = "core"\n'
+            'version = "1.0.0"\n'
+            'version_files = ["core/__version__.py"]\n'
+            "[tool.commitizen.packages.cli]\n"
+            'path = "cli"\n'
+            'version = "0.1.0"\n'
+        )
+    Path("core").mkdir()
+    Path("cli").mkdir()
+    with open("core/__version__.py", "w") as f:
+        f.write('__version__ = "1.0.0"\n')
+    create_file_and_commit("feat: first", filename="core/a.py")
+    cmd.run(["git", "tag", "core-1.0.0"])
+    cmd.run(["git", "tag", "cli-0.1.0"])
+    create_file_and_commit("feat(core): new feature", filename="core/b.py")
+    create_file_and_commit("docs: readme", filename="README.md")
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_bump_packages(mocker):
+    create_packages()
+
+    testargs = ["cz", "bump", "--yes"]
+    mocker.patch.object(sys, "argv", testargs)
+    cli.main()
+
+    assert git.tag_exist("core-1.1.0") is True
+    assert git.tag_exist("cli-0.1.1") is False
+    with open("core/__version__.py") as f:
+        assert f.read() == '__version__ = "1.1.0"\n'
+    with open("pyproject.toml") as f:
+        config = f.read()
+    assert 'version = "1.1.0"' in config
+    assert 'version = "0.1.0"' in config
+    assert git.get_commits(start="core-1.0.0")[0].title == "bump: core 1.1.0"
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_bump_packages_files_only(mocker):
+    create_packages()
+
+    testargs = ["cz", "bump", "--yes", "--files-only"]
+    mocker.patch.object(sys, "argv", testargs)
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    with open("core/__version__.py") as f:
+        assert f.read() == '__version__ = "1.1.0"\n'
+    with open("pyproject.toml") as f:
+        assert 'version = "1.1.0"' not in f.read()
+    assert git.tag_exist("core-1.1.0") is False
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_ignores_commits_of_ignored_paths(mocker, capsys):
+    with open("pyproject.toml", "a") as f:
+        f.write('\nbump_ignore_paths = ["docs", ".github"]\n')
+    Path("docs").mkdir()
+    create_file_and_commit("feat: new file")
+    cmd.run(["git", "tag", "0.1.0"])
+    create_file_and_commit("feat: document it", filename="docs/index.md")
+    create_file_and_commit("fix: typo", filename="src.py")
+
+    testargs = ["cz", "bump", "--yes", "--dry-run"]
+    mocker.patch.object(sys, "argv", testargs)
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "increment detected: PATCH" in out
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_with_bump_grep(mocker, capsys):
+    with open("pyproject.toml", "a") as f:
+        f.write("\nbump_grep = true\n")
+    create_file_and_commit("feat: new file")
+    cmd.run(["git", "tag", "0.1.0"])
+    create_file_and_commit("chore: nothing to release")
+    create_file_and_commit("fix: a bug")
+    create_file_and_commit("docs: nothing to release either")
+
+    testargs = ["cz", "bump", "--yes", "--dry-run"]
+    mocker.patch.object(sys, "argv", testargs)
+    iter_commits = mocker.spy(git, "iter_commits")
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "increment detected: PATCH" in out
+    filters = iter_commits.call_args[1]["filters"]
+    log = git.iter_commits("0.1.0", filters=filters)
+    assert [commit.title for commit in log] == ["fix: a bug"]
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_with_bump_grep_and_a_subject_on_two_lines(mocker, capsys):
+    with open("pyproject.toml", "a") as f:
+        f.write("\nbump_grep = true\n")
+    create_file_and_commit("BREAKING\nCHANGE: drop api")
+
+    testargs = ["cz", "bump", "--yes", "--dry-run"]
+    mocker.patch.object(sys, "argv", testargs)
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "increment detected: MAJOR" in out
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_with_first_parent(mocker, capsys):
+    with open("pyproject.toml", "a") as f:
+        f.write("\nfirst_parent = true\n")
+    create_file_and_commit("feat: new file")
+    cmd.run(["git", "tag", "0.1.0"])
+    cmd.run(["git", "checkout", "-b", "feature"])
+    create_file_and_commit("feat: work in progress")
+    cmd.run(["git", "checkout", "-"])
+    cmd.run(["git", "merge", "--no-ff", "-m", "fix: merge the feature", "feature"])
+
+    testargs = ["cz", "bump", "--yes", "--dry-run"]
+    mocker.patch.object(sys, "argv", testargs)
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "increment detected: PATCH" in out
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_updates_keys_of_version_files(mocker, capsys):
+    with open("pyproject.toml", "a") as f:
+        f.write('\nversion_files = ["package.json#version", "package.json#other"]\n')
+    with open("package.json", "w") as f:
+        f.write('{"dependency": "0.1.0", "version": "0.1.0"}\n')
+    create_file_and_commit("feat: new file")
+
+    testargs = ["cz", "bump", "--yes", "--files-only"]
+    mocker.patch.object(sys, "argv", testargs)
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main()
+
+    assert excinfo.value.code == INVALID_VERSION_FILE
+    _, err = capsys.readouterr()
+    assert "Could not find a value for other" in err
+    with open("package.json") as f:
+        assert f.read() == '{"dependency": "0.1.0", "version": "0.1.0"}\n'
+
+    with open("pyproject.toml") as f:
+        config = f.read().replace(', "package.json#other"', "")
+    with open("pyproject.toml", "w") as f:
+        f.write(config)
+    with pytest.raises(SystemExit):
+        cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "updated package.json: line 1" in out
+    with open("package.json") as f:
+        assert f.read() == '{"dependency": "0.1.0", "version": "0.2.0"}\n'
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_with_discover(mocker, capsys):
+    with open("README.md", "w") as f:
+        f.write("Install 0.1.0\n")
+    create_file_and_commit("feat: new file", filename="README.md")
+    with open("untracked.txt", "w") as f:
+        f.write("0.1.0\n")
+
+    testargs = ["cz", "bump", "--yes", "--discover"]
+    mocker.patch.object(sys, "argv", testargs)
+    cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "README.md: line 1" in out
+    assert "updated README.md: line 1" in out
+    with open("README.md") as f:
+        assert f.read() == "Install 0.2.0\n"
+    with open("untracked.txt") as f:
+        assert f.read() == "0.1.0\n"
+    assert git.tag_exist("0.2.0") is True
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_only_commits_the_files_it_changed(mocker):
+    with open("pyproject.toml", "a") as f:
+        f.write('\nversion_files = ["__version__.py"]\n')
+    with open("__version__.py", "w") as f:
+        f.write('__version__ = "0.1.0"\n')
+    Path("notes.txt").touch()
+    create_file_and_commit("feat: new file", filename="staged.txt")
+    with open("notes.txt", "w") as f:
+        f.write("work in progress\n")
+    Path("staged.txt").write_text("staged\n")
+    cmd.run("git add staged.txt")
+
+    testargs = ["cz", "bump", "--yes"]
+    mocker.patch.object(sys, "argv", testargs)
+    cli.main()
+
+    changed = cmd.run("git show --name-only --pretty=format: HEAD").out.split()
+    assert sorted(changed) == ["__version__.py", "pyproject.toml"]
+    status = cmd.run("git status --porcelain").out.splitlines()
+    assert sorted(status) == [" M notes.txt", "M  staged.txt"]
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_bump_with_no_verify(mocker):
+    create_file_and_commit("feat: new file")
+    hook = Path(".git/hooks/pre-commit")
+    hook.write_text("#!/bin/sh\nexit 1\n")
+    hook.chmod(0o755)
+
+    testargs = ["cz", "bump", "--yes"]
+    mocker.patch.object(sys, "argv", testargs)
+    with pytest.raises(SystemExit):
+        cli.main()
+    assert git.tag_exist("0.2.0") is False
+
+    cmd.run("git checkout HEAD -- pyproject.toml")
+    mocker.patch.object(sys, "argv", testargs + ["--no-verify"])
+    cli.main()
+    assert git.tag_exist("0.2.0") is True
@@ -1,9 +1,10 @@
 import sys
+from pathlib import Path
 from typing import List
 
 import pytest
 
-from commitizen import cli, commands, git
+from commitizen import cli, cmd, commands, git
 
 COMMIT_LOG = [
     "refactor: A code change that neither fixes a bug nor adds a feature",
@@ -159,8 +160,10 @@ def test_check_command_when_commit_file_not_found(config):
 
 def test_check_a_range_of_git_commits(config, mocker):
     success_mock = mocker.patch("commitizen.out.success")
+    commits = _build_fake_git_commits(COMMIT_LOG)
     mocker.patch(
-        "commitizen.git.get_commits", return_value=_build_fake_git_commits(COMMIT_LOG)
+        "commitizen.git.iter_commit_fields",
+        return_value=[(commit.title, commit.body) for commit in commits],
     )
 
     check_cmd = commands.Check(
@@ -173,9 +176,10 @@ def test_check_a_range_of_git_commits(config, mocker):
 
 def test_check_a_range_of_git_commits_and_failed(config, mocker):
     error_mock = mocker.patch("commitizen.out.error")
+    commits = _build_fake_git_commits(["This commit does not follow rule"])
     mocker.patch(
-        "commitizen.git.get_commits",
-        return_value=_build_fake_git_commits(["This commit does not follow rule"]),
+        "commitizen.git.iter_commit_fields",
+        return_value=[(commit.title, commit.body) for commit in commits],
     )
     check_cmd = commands.Check(
         config=config, arguments={"rev_range": "HEAD~10..master"}
@@ -194,3 +198,58 @@ def test_check_command_with_invalid_argment(args, config, capsys):
         commands.Check(config=config, arguments=args)
     _, err = capsys.readouterr()
     assert "One and only one argument is required for check command!" in err
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_check_a_range_of_git_commits_with_commit_cache(config, mocker):
+    config.settings["commit_cache"] = True
+    for message in ("feat: first", "fix: second"):
+        Path(message).touch()
+        cmd.run("git add .")
+        git.commit(message)
+
+    success_mock = mocker.patch("commitizen.out.success")
+    get_commit = mocker.spy(git, "get_commit")
+    commands.Check(config=config, arguments={"rev_range": "HEAD"})()
+    assert get_commit.call_count == 2
+    # Every commit is known to be valid, so no message is read again
+    commands.Check(config=config, arguments={"rev_range": "HEAD"})()
+    assert get_commit.call_count == 2
+    assert success_mock.call_count == 2
+
+    Path("third").touch()
+    cmd.run("git add .")
+    git.commit("this commit does not follow rule")
+    with pytest.raises(SystemExit):
+        commands.Check(config=config, arguments={"rev_range": "HEAD"})()
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+@pytest.mark.parametrize("commit_cache", (False, True))
+def test_check_a_range_of_git_commits_with_first_parent(config, mocker, commit_cache):
+    config.settings.update(first_parent=True, commit_cache=commit_cache)
+    git.commit("feat: first", args="--allow-empty")
+    cmd.run("git checkout -b feature")
+    git.commit("work in progress", args="--allow-empty")
+    cmd.run("git checkout -")
+    cmd.run("git merge --no-ff -m 'feat: merge the feature' feature")
+
+    success_mock = mocker.patch("commitizen.out.success")
+    commands.Check(config=config, arguments={"rev_range": "HEAD"})()
+    success_mock.assert_called_once()
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_check_a_range_of_git_commits_with_jobs(config, mocker):
+    for message in ("feat: first", "fix: second", "docs: third"):
+        git.commit(message, args="--allow-empty")
+    iter_commits_parallel = mocker.spy(git, "iter_commits_parallel")
+
+    success_mock = mocker.patch("commitizen.out.success")
+    commands.Check(config=config, arguments={"rev_range": "HEAD", "jobs": 2})()
+    success_mock.assert_called_once()
+    iter_commits_parallel.assert_called_once()
+
+    git.commit("this commit does not follow rule", args="--allow-empty")
+    with pytest.raises(SystemExit):
+        commands.Check(config=config, arguments={"rev_range": "HEAD", "jobs": 2})()
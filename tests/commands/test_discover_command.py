@@ -0,0 +1,91 @@
+import sys
+
+import pytest
+
+from commitizen import cli, cmd, git
+from commitizen.error_codes import NO_VERSION_SPECIFIED
+
+
+class FakeQuestion:
+    def __init__(self, expected_return):
+        self.expected_return = expected_return
+
+    def ask(self):
+        return self.expected_return
+
+
+def _commit_files(files: dict):
+    for name, content in files.items():
+        with open(name, "w") as f:
+            f.write(content)
+    cmd.run("git add .")
+    git.commit("feat: new files")
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_discover_adds_files_to_version_files(mocker, capsys):
+    with open("pyproject.toml", "a") as f:
+        f.write('\nversion_files = ["setup.py:version"]\n')
+    _commit_files(
+        {
+            "setup.py": "version='0.1.0'\n",
+            "README.md": "# Title\n\nInstall 0.1.0 with 0.1.0\n",
+            "Dockerfile": "FROM python\nLABEL version=0.1.0\n",
+            "CHANGES.md": "Download v0.1.0\n",
+            "other.txt": "0.2.0\n10.1.0\n0.1.0.1\n",
+            "requirements.txt": "foo==0.1.0\nbar >= 0.1.0\n",
+        }
+    )
+    with open("untracked.txt", "w") as f:
+        f.write("0.1.0\n")
+    checkbox = mocker.patch(
+        "questionary.checkbox", return_value=FakeQuestion(["README.md"])
+    )
+
+    mocker.patch.object(sys, "argv", ["cz", "discover"])
+    cli.main()
+
+    out, _ = capsys.readouterr()
+    assert "CHANGES.md: line 1\nDockerfile: line 2\nREADME.md: line 3\n" in out
+    assert checkbox.call_args[1]["choices"] == ["CHANGES.md", "Dockerfile", "README.md"]
+    with open("pyproject.toml") as f:
+        assert (
+            'version_files = ["setup.py:version", "README.md:^Install\\\\ (?=\\\\d)"]'
+            in f.read()
+        )
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_discover_without_version(mocker):
+    with open("pyproject.toml", "w") as f:
+        f.write("[tool.commitizen]\n")
+
+    mocker.patch.object(sys, "argv", ["cz", "discover", "--yes"])
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main()
+    assert excinfo.value.code == NO_VERSION_SPECIFIED
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_discover_yes_adds_the_lines_found(mocker):
+    _commit_files(
+        {
+            "VERSION": "0.1.0\n",
+            "setup.cfg": "version = 0.1.0\n",
+            "README.md": "Download v0.1.0\n",
+        }
+    )
+
+    mocker.patch.object(sys, "argv", ["cz", "discover", "--yes"])
+    cli.main()
+    with open("setup.cfg", "a") as f:
+        f.write("requires = foo==0.1.0\n")
+    mocker.patch.object(sys, "argv", ["cz", "bump", "--yes"])
+    cli.main()
+
+    with open("VERSION") as f:
+        assert f.read() == "0.2.0\n"
+    with open("setup.cfg") as f:
+        assert f.read() == "version = 0.2.0\nrequires = foo==0.1.0\n"
+    with open("README.md") as f:
+        assert f.read() == "Download v0.2.0\n"
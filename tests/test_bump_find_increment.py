@@ -90,3 +90,63 @@ def test_find_increment_sve(messages, expected_type):
         commits, regex=semantic_version_pattern, increments_map=semantic_version_map
     )
     assert increment_type == expected_type
+
+
+def test_find_increment_stops_at_highest_increment():
+    def lazy_commits():
+        yield GitCommit(rev="test", title="fix: first")
+        yield GitCommit(rev="test", title="feat!: breaking")
+        raise AssertionError("history was read after a MAJOR increment")
+
+    assert bump.find_increment(lazy_commits()) == "MAJOR"
+
+
+def test_find_increment_highest_increment_of_the_map():
+    def lazy_commits():
+        yield GitCommit(rev="test", title="added version to cli MINOR")
+        raise AssertionError("history was read after the highest increment")
+
+    increments_map = {"MINOR": "MINOR", "PATCH": "PATCH"}
+    increment_type = bump.find_increment(
+        lazy_commits(), regex=r"(MINOR|PATCH)", increments_map=increments_map
+    )
+    assert increment_type == "MINOR"
+
+
+def test_find_increment_patch_is_not_final():
+    # A selected keyword missing from the map resets a PATCH, so reading
+    # cannot stop at the first PATCH of a map without MINOR or MAJOR.
+    commits = [
+        GitCommit(rev="test", title="fix: a"),
+        GitCommit(rev="test", title="docs: b"),
+    ]
+    increment_type = bump.find_increment(
+        commits, regex=r"^(fix|docs)", increments_map={"fix": "PATCH"}
+    )
+    assert increment_type is None
+
+
+@pytest.mark.parametrize(
+    "messages, expected_type",
+    (
+        (PATCH_INCREMENTS_CC, "PATCH"),
+        (MINOR_INCREMENTS_CC, "MINOR"),
+        (MAJOR_INCREMENTS_BREAKING_CHANGE_CC, "MAJOR"),
+        (MAJOR_INCREMENTS_EXCLAMATION_CC, "MAJOR"),
+        (NONE_INCREMENT_CC, None),
+    ),
+)
+def test_find_increment_with_classifier(messages, expected_type):
+    classifier = bump.IncrementClassifier()
+    commits = [GitCommit(rev="test", title=message) for message in messages]
+    increment_type = bump.find_increment(commits, classifier=classifier)
+    assert increment_type == expected_type
+
+
+def test_increment_classifier_keyword_increment():
+    classifier = bump.IncrementClassifier()
+
+    assert classifier.highest_increment == "MAJOR"
+    assert classifier.keyword_increment("feat(cli)!") == "MAJOR"
+    assert classifier.keyword_increment("feat(cli)") == "MINOR"
+    assert classifier.keyword_increment("docs") is None
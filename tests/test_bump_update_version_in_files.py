@@ -2,7 +2,7 @@ import os
 
 import pytest
 
-from commitizen import bump
+from commitizen import bump, git
 
 PYPROJECT = """
 [tool.poetry]
@@ -70,3 +70,120 @@ def test_partial_update_of_file(create_files):
         data = f.read()
         assert new_version in data
         assert old_version in data
+
+
+def test_file_without_changes_is_not_written(tmpdir):
+    version_file = tmpdir.join("package.json")
+    version_file.write(REPEATED_VERSION_NUMBER)
+    inode = os.stat(version_file).st_ino
+
+    bump.update_version_in_files("9.9.9", "10.0.0", [str(version_file)])
+    bump.update_version_in_files("1.2.3", "2.0.0", [f"{version_file}:description"])
+    assert os.stat(version_file).st_ino == inode
+    assert version_file.read() == REPEATED_VERSION_NUMBER
+    assert tmpdir.listdir() == [version_file]
+
+
+def test_file_is_replaced_atomically(tmpdir):
+    version_file = tmpdir.join("__version__.py")
+    version_file.write(VERSION_PY)
+    os.chmod(version_file, 0o751)
+    link = tmpdir.join("link.py")
+    link.mksymlinkto(version_file)
+
+    assert bump.update_version_in_file(str(link), "1.2.3", "2.0.0") == [5]
+    assert link.islink()
+    assert version_file.read() == VERSION_PY.replace("1.2.3", "2.0.0")
+    assert os.stat(version_file).st_mode & 0o777 == 0o751
+    assert sorted(tmpdir.listdir()) == [version_file, link]
+
+
+def test_line_endings_and_encoding_are_kept(tmpdir):
+    version_file = tmpdir.join("version.txt")
+    content = "# caf\xe9\r\nversion = 1.2.3\r\nother = 1.2.3\r\n".encode("latin-1")
+    version_file.write_binary(content)
+
+    bump.update_version_in_files("1.2.3", "2.0.0", [f"{version_file}:^version.*3$"])
+    assert version_file.read_binary() == content.replace(
+        b"version = 1.2.3", b"version = 2.0.0"
+    )
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+@pytest.mark.parametrize("jobs", (1, 4))
+def test_update_version_in_globbed_files(jobs):
+    for plugin in ("a", "b", "c", ".hidden", "ignored"):
+        os.makedirs(f"plugins/{plugin}")
+        with open(f"plugins/{plugin}/__version__.py", "w") as f:
+            f.write(VERSION_PY)
+    os.makedirs("plugins/a/nested")
+    with open("plugins/a/nested/package.json", "w") as f:
+        f.write(REPEATED_VERSION_NUMBER)
+    with open(".gitignore", "w") as f:
+        f.write("plugins/ignored/\n")
+
+    updated = bump.update_version_in_files(
+        "1.2.3",
+        "2.0.0",
+        [
+            "plugins/*/__version__.py:__version__",
+            "plugins/**/*.json:version",
+            "plugins/a/__version__.py",
+            "plugins/missing/*.py",
+        ],
+        jobs=jobs,
+    )
+    assert updated == {
+        "plugins/a/__version__.py": [5],
+        "plugins/b/__version__.py": [5],
+        "plugins/c/__version__.py": [5],
+        "plugins/a/nested/package.json": [4],
+    }
+    for plugin in ("a", "b", "c", ".hidden", "ignored"):
+        with open(f"plugins/{plugin}/__version__.py") as f:
+            assert ("2.0.0" in f.read()) is (plugin in ("a", "b", "c"))
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_expand_version_file_skips_ignored_directories(mocker):
+    for package in ("app", "node_modules/a", "node_modules/b/nested"):
+        os.makedirs(package)
+        with open(f"{package}/package.json", "w") as f:
+            f.write(REPEATED_VERSION_NUMBER)
+    with open(".gitignore", "w") as f:
+        f.write("node_modules/\n")
+    get_ignored_paths = mocker.spy(git, "get_ignored_paths")
+
+    assert bump.expand_version_file("**/package.json") == ["app/package.json"]
+    checked = [path for call in get_ignored_paths.call_args_list for path in call[0][0]]
+    assert "node_modules/" in checked
+    assert not [path for path in checked if path.startswith("node_modules/a")]
+
+
+def test_expand_version_file_without_glob():
+    assert bump.expand_version_file("does/not/exist.py") == ["does/not/exist.py"]
+
+
+def test_update_version_of_keys(tmpdir):
+    package_json = tmpdir.join("package.json")
+    package_json.write(REPEATED_VERSION_NUMBER)
+    pyproject = tmpdir.join("pyproject.toml")
+    pyproject.write(PYPROJECT + '[tool.commitizen]\nversion = "1.2.3"\n')
+
+    updated = bump.update_version_in_files(
+        "1.2.3",
+        "2.0.0",
+        [
+            f"{package_json}#version",
+            f"{pyproject}#tool.poetry.version",
+            f"{pyproject}:commitizen",
+        ],
+    )
+    assert updated == {str(package_json): [4], str(pyproject): [4]}
+    assert package_json.read() == REPEATED_VERSION_NUMBER.replace(
+        '"version": "1.2.3"', '"version": "2.0.0"'
+    )
+    assert pyproject.read().count("1.2.3") == 1
+
+    with pytest.raises(ValueError):
+        bump.update_version_in_files("2.0.0", "3.0.0", [f"{package_json}#versions"])
@@ -0,0 +1,56 @@
+import asyncio
+import sys
+
+from commitizen import cmd
+
+
+def test_run_without_shell():
+    c = cmd.run([sys.executable, "-c", "import sys; print('out'); sys.exit(3)"])
+
+    assert c.return_code == 3
+    assert c.stdout == b"out\n"
+    assert c._out is None
+    assert c.out == "out\n"
+    assert c.err == ""
+
+
+def test_run_with_shell():
+    c = cmd.run("echo $((1 + 1)) && echo error >&2")
+
+    assert c.return_code == 0
+    assert c.out == "2\n"
+    assert c.err == "error\n"
+
+
+def test_command_keeps_decoded_output():
+    c = cmd.Command("success", "", b"", b"")
+
+    assert c.out == "success"
+    assert c.return_code == 0
+
+
+def test_stream():
+    script = "import sys; sys.stdout.write('a\\0b\\0' * 50000 + 'c')"
+    records = cmd.stream([sys.executable, "-c", script], separator=b"\0")
+
+    assert next(records) == b"a"
+    assert next(records) == b"b"
+    assert list(records)[-1] == b"c"
+
+    records = cmd.stream([sys.executable, "-c", script], separator=b"\0")
+    assert next(records) == b"a"
+    # Stops the process before it has printed everything
+    records.close()
+
+
+def test_gather_keeps_the_current_event_loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        python = cmd.run_async(sys.executable, "-c", "print('ok')")
+        (c,) = cmd.gather(python)
+        assert c.out == "ok\n"
+        assert asyncio.get_event_loop() is loop
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
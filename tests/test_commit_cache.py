@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+
+from commitizen import defaults
+from commitizen.commit_cache import CommitCache, rules_fingerprint
+from commitizen.config import BaseConfig
+from commitizen.cz.conventional_commits import ConventionalCommitsCz
+
+
+@pytest.fixture()
+def config():
+    _config = BaseConfig()
+    _config.settings.update({"name": defaults.name})
+    return _config
+
+
+def test_cache_roundtrip(tmpdir):
+    path = Path(tmpdir) / "commitizen" / "commits.sqlite"
+
+    cache = CommitCache(path, "rules")
+    assert cache.get_increments("abc") is None
+    cache.set_increments("abc", ["MINOR", None])
+    cache.set_valid("abc", True)
+    cache.set_valid("def", False)
+    cache.close()
+
+    cache = CommitCache(path, "rules")
+    assert cache.get_increments("abc") == ["MINOR", None]
+    assert cache.get_valid("abc") is True
+    assert cache.get_valid("def") is False
+    assert cache.get_increments("def") is None
+    cache.close()
+
+    # Results depend on the rules they were computed with
+    cache = CommitCache(path, "other rules")
+    assert cache.get_increments("abc") is None
+    cache.close()
+
+
+def test_cache_keeps_the_other_result_of_an_entry(tmpdir):
+    path = Path(tmpdir) / "commits.sqlite"
+
+    cache = CommitCache(path, "rules")
+    cache.set_increments("abc", ["PATCH"])
+    cache.close()
+    cache = CommitCache(path, "rules")
+    cache.set_valid("abc", False)
+    cache.close()
+
+    cache = CommitCache(path, "rules")
+    assert cache.get_increments("abc") == ["PATCH"]
+    assert cache.get_valid("abc") is False
+    cache.close()
+
+
+def test_cache_evicts_least_recently_used(tmpdir):
+    path = Path(tmpdir) / "commits.sqlite"
+
+    cache = CommitCache(path, "rules", max_entries=2)
+    cache.set_increments("first", [])
+    cache.close()
+
+    cache = CommitCache(path, "rules", max_entries=2)
+    cache.set_increments("second", [])
+    cache.close()
+
+    cache = CommitCache(path, "rules", max_entries=2)
+    assert cache.get_increments("first") == []
+    cache.set_increments("third", [])
+    cache.close()
+
+    cache = CommitCache(path, "rules", max_entries=2)
+    assert cache.get_increments("first") == []
+    assert cache.get_increments("second") is None
+    assert cache.get_increments("third") == []
+    cache.close()
+
+
+def test_rules_fingerprint(config):
+    cz = ConventionalCommitsCz(config)
+    fingerprint = rules_fingerprint(cz)
+    assert fingerprint == rules_fingerprint(ConventionalCommitsCz(config))
+
+    cz.bump_map = {"^feat": "MAJOR"}
+    assert rules_fingerprint(cz) != fingerprint
+
+
+def test_cache_is_disabled_by_default(config):
+    assert CommitCache.from_config(ConventionalCommitsCz(config)) is None
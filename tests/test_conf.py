@@ -3,7 +3,8 @@ from pathlib import Path
 
 import pytest
 
-from commitizen import config, defaults, git
+from commitizen import config, defaults, git, git_objects
+from commitizen.error_codes import INVALID_CONFIG
 
 PYPROJECT = """
 [tool.commitizen]
@@ -148,6 +149,55 @@ class TestInilConfig:
         ini_config = config.IniConfig(data="", path=path)
         assert ini_config.is_empty_config
 
+    @pytest.mark.parametrize(
+        "value, expected",
+        (("true", True), ("false", False), ('"false"', False), ("yes", True)),
+    )
+    @pytest.mark.parametrize(
+        "key",
+        (
+            "commit_cache",
+            "native_object_reader",
+            "use_fsmonitor",
+            "bump_grep",
+            "first_parent",
+            "no_merges",
+            "subject_only",
+        ),
+    )
+    def test_read_boolean_settings(self, tmpdir, key, value, expected):
+        data = f"[commitizen]\n{key} = {value}\n"
+        ini_config = config.IniConfig(data=data, path=tmpdir.join("setup.cfg"))
+        assert ini_config.settings[key] is expected
+
+    def test_read_list_settings(self, tmpdir):
+        data = (
+            "[commitizen]\n"
+            'bump_paths = ["src", "setup.py"]\n'
+            'bump_ignore_paths = ["docs"]\n'
+        )
+        ini_config = config.IniConfig(data=data, path=tmpdir.join("setup.cfg"))
+        assert ini_config.settings["bump_paths"] == ["src", "setup.py"]
+        assert ini_config.settings["bump_ignore_paths"] == ["docs"]
+
+    def test_read_history_modes(self, tmpdir):
+        data = "[commitizen]\nfirst_parent = false\nno_merges = true\n"
+        ini_config = config.IniConfig(data=data, path=tmpdir.join("setup.cfg"))
+        assert git_objects.walk_filters(ini_config.settings) == ["--no-merges"]
+
+    def test_read_integer_settings(self, tmpdir):
+        data = "[commitizen]\ncommit_cache_size = 500\n"
+        ini_config = config.IniConfig(data=data, path=tmpdir.join("setup.cfg"))
+        assert ini_config.settings["commit_cache_size"] == 500
+
+    @pytest.mark.parametrize(
+        "data", ("commit_cache = maybe", "commit_cache_size = many")
+    )
+    def test_read_invalid_settings(self, tmpdir, data):
+        with pytest.raises(SystemExit) as excinfo:
+            config.IniConfig(data=f"[commitizen]\n{data}\n", path=tmpdir)
+        assert excinfo.value.code == INVALID_CONFIG
+
 
 class TestTomlConfig:
     def test_init_empty_config_content(self, tmpdir):
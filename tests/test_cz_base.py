@@ -51,3 +51,18 @@ def test_info(config):
     cz = DummyCz(config)
     with pytest.raises(NotImplementedError):
         cz.info()
+
+
+def test_increment_classifier(config):
+    cz = DummyCz(config)
+    assert cz.increment_classifier is None
+
+    cz.bump_pattern = defaults.bump_pattern
+    cz.bump_map = defaults.bump_map
+    classifier = cz.increment_classifier
+    assert classifier is not None
+    assert cz.increment_classifier is classifier
+
+    cz.bump_map = {"^feat": "MINOR"}
+    assert cz.increment_classifier is not classifier
+    assert cz.increment_classifier.highest_increment == "MINOR"
@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+from commitizen import cmd, defaults, ere, git
+
+
+@pytest.mark.parametrize(
+    "regex, expected",
+    (
+        (
+            defaults.bump_pattern,
+            r"^[[:space:]]*((BREAKING|feat|fix|refactor|perf))",
+        ),
+        (r"^(major|patch)!?$", r"^[[:space:]]*((major|patch))(!)?[[:space:]]*$"),
+        (r"[]a^-]x{2,3}?", r"[]a^-](x){2,3}"),
+        (r"[^^ ]|\.\[", r"([^ ^]|\.\[)"),
+        (r"^(?:feat|fix)\(.*\)", r"^[[:space:]]*f(eat|ix)\("),
+        (r"x( y)+", r"x"),
+        (r"[\\x]", r"[\x]"),
+    ),
+)
+def test_translate(regex, expected):
+    assert ere.translate(regex) == ere.GrepPattern(expected, False)
+
+
+def test_translate_ignore_case():
+    grep = ere.translate(r"(?i)^feat")
+    assert grep.git_args() == [
+        "--extended-regexp",
+        "--grep=^[[:space:]]*feat",
+        "--regexp-ignore-case",
+    ]
+
+
+@pytest.mark.parametrize(
+    "regex",
+    (
+        r"^feat\s",
+        r"\bfeat",
+        r"(?=feat)",
+        r"(a)\1",
+        r"\Afeat",
+        r"(?s)feat.",
+        r"(?i)été",
+        r"feat(|ure)",
+        r"[^^]|\.\[",
+        r" feat",
+        r"x{300}",
+        r"feat\n",
+        r"(unbalanced",
+    ),
+)
+def test_translate_unsupported(regex):
+    assert ere.translate(regex) is None
+
+
+MESSAGES = [
+    "feat: new feature",
+    "fix(scope): a fix",
+    "refactor!: breaking refactor",
+    "chore: nothing",
+    "docs: feat is not at the start",
+    "  feat: indented title",
+    "chore: body\n\nBREAKING CHANGE: in the body",
+    "chore: body\n\nBREAKING-CHANGE: trailing spaces   ",
+    "perf(]-^): odd scope",
+    "BREAKING\nCHANGE: subject on two lines",
+]
+
+
+@pytest.mark.parametrize(
+    "regex",
+    (
+        defaults.bump_pattern,
+        r"^(?:feat|fix)\(.*\)",
+        r"[]^-]",
+        r"spaces\s*$".replace(r"\s*", " *"),
+        r"(?i)^FEAT",
+    ),
+)
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_git_selects_every_commit_python_selects(regex):
+    for message in MESSAGES:
+        cmd.run(["git", "commit", "--allow-empty", "--cleanup=verbatim", "-m", message])
+
+    pattern = re.compile(regex)
+    expected = {
+        commit.rev
+        for commit in git.iter_commits()
+        if any(pattern.search(line) for line in commit.message.split("\n"))
+    }
+    grep = ere.translate(regex)
+    selected = {commit.rev for commit in git.iter_commits(filters=grep.git_args())}
+    assert expected and expected <= selected
@@ -1,4 +1,10 @@
-from commitizen import git
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import pytest
+
+from commitizen import cmd, git
 
 
 class FakeCommand:
@@ -17,6 +23,63 @@ def test_git_object_eq():
     assert git_commit != "sha1-code"
 
 
+def test_git_commit_stores_shas_as_bytes():
+    sha = "0123456789abcdef0123456789abcdef01234567"
+    commit = git.GitCommit(sha, "feat: title")
+
+    assert commit.rev == sha
+    assert commit._sha == bytes.fromhex(sha)
+    assert git.GitCommit("test_rev", "feat: title").rev == "test_rev"
+    assert git.GitCommit(sha.upper(), "feat: title").rev == sha.upper()
+
+
+def test_git_commit_from_log_record():
+    log = b"\0".join(
+        [b"1" * 40 + b"\nfeat: first\n\nwith a body\n", b"2" * 40 + b"\nfix: no body"]
+    )
+    first, second = git.parse_log_output(log)
+
+    assert first._buffer is log
+    assert (first.title, first.body) == ("feat: first", "with a body")
+    assert first._buffer is None
+    assert first.message == "feat: first\n\nwith a body"
+    assert (second.rev, second.message) == ("2" * 40, "fix: no body")
+
+
+def test_git_commits_of_a_log_are_compact():
+    records = [
+        f"{uuid.uuid4().hex:0<40}\nfeat(scope): change {number}\n\n"
+        f"A body explaining the change {number}\nRefs: #{number}"
+        for number in range(2000)
+    ]
+
+    class DictGitCommit:
+        def __init__(self, rev, title, body=""):
+            self.rev = rev.strip()
+            self.title = title.strip()
+            self.body = body.strip()
+
+    def parse_to_dicts(log):
+        for record in log.decode().split("\0"):
+            rev, _, message = record.partition("\n")
+            title, _, body = message.partition("\n")
+            yield DictGitCommit(rev, title, body)
+
+    def traced_size(parse):
+        # The log and every body are counted, like the baseline holds them
+        tracemalloc.start()
+        try:
+            commits = list(parse("\0".join(records).encode()))
+            assert all(commit.body for commit in commits)
+            return tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    size = traced_size(git.parse_log_output)
+    dict_size = traced_size(parse_to_dicts)
+    assert size < dict_size * 0.9
+
+
 def test_get_tags(mocker):
     tag_str = (
         "v1.0.0---inner_delimiter---333---inner_delimiter---2020-01-20\n"
@@ -54,3 +117,282 @@ def test_git_message_with_empty_body():
     commit = git.GitCommit("test_rev", "Some Title", body="")
 
     assert commit.message == commit_title
+
+
+def _commit(message: str):
+    Path(str(uuid.uuid4())).touch()
+    cmd.run("git add .")
+    return git.commit(message)
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_get_commit_through_object_reader():
+    _commit("feat: new file\n\nthis is the body\nsecond line")
+
+    commit = git.get_commit("HEAD")
+    assert commit.title == "feat: new file"
+    assert commit.body == "this is the body\nsecond line"
+    assert commit == git.get_commits()[0]
+    assert git.get_commit("does-not-exist") is None
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_tag_exist_is_an_exact_match():
+    _commit("feat: new file")
+    cmd.run("git tag v1.0.0")
+
+    assert git.tag_exist("v1.0.0") is True
+    assert git.tag_exist("1.0.0") is False
+
+    # The reader is long-lived, new refs must still be seen.
+    cmd.run("git tag 1.0.0")
+    assert git.tag_exist("1.0.0") is True
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_iter_commits_matches_get_commits():
+    _commit("feat: first\n\nwith a body")
+    _commit("fix: second")
+    _commit("feat!: third\n\nmultiline\n\nbody")
+
+    # A tiny chunk size forces records to be split across reads
+    commits = list(git.iter_commits(chunk_size=7))
+    expected = git.get_commits()
+    assert commits == expected
+    assert [c.message for c in commits] == [c.message for c in expected]
+    assert list(git.iter_commits(expected[-1].rev)) == expected[:-1]
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_iter_commits_without_commits():
+    assert list(git.iter_commits()) == []
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_iter_commits_can_be_closed_early():
+    _commit("feat: first")
+    _commit("fix: second")
+
+    commits = git.iter_commits()
+    assert next(commits).title == "fix: second"
+    commits.close()
+    with pytest.raises(StopIteration):
+        next(commits)
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_iter_lazy_commits():
+    _commit("feat: first\n\nwith a body")
+    _commit("fix: second")
+
+    commits = list(git.iter_lazy_commits())
+    assert commits == git.get_commits()
+    assert [c.message for c in commits] == [c.message for c in git.get_commits()]
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_grep_fixed_string_with_a_name_in_another_encoding():
+    with open("caf\xe9.txt".encode("latin-1"), "wb") as f:
+        f.write(b"version 1.0.0\nnothing\n1.0.0 caf\xe9\n")
+    cmd.run("git add .")
+
+    assert git.grep_fixed_string("1.0.0") == {
+        "caf\udce9.txt": [(1, b"version 1.0.0"), (3, b"1.0.0 caf\xe9")]
+    }
+
+
+def test_get_pathspecs():
+    assert git.get_pathspecs() == []
+    assert git.get_pathspecs(["src"], ["src/tests"]) == [
+        ":(top)src",
+        ":(top,exclude)src/tests",
+    ]
+    assert git.get_pathspecs(exclude=["docs", "*.md"]) == [
+        ":/",
+        ":(top,exclude)docs",
+        ":(top,exclude)*.md",
+    ]
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_iter_commits_with_pathspecs():
+    _commit("feat: first")
+    Path("docs").mkdir()
+    Path("docs/index.md").touch()
+    cmd.run("git add .")
+    git.commit("feat: docs only")
+    _commit("fix: code")
+
+    pathspecs = git.get_pathspecs(exclude=["docs"])
+    titles = [commit.title for commit in git.iter_commits(pathspecs=pathspecs)]
+    assert titles == ["fix: code", "feat: first"]
+    lazy_commits = list(git.iter_lazy_commits(pathspecs=pathspecs))
+    assert lazy_commits[0].title == "fix: code"
+    assert len(lazy_commits) == 2
+    docs = git.iter_commits(pathspecs=git.get_pathspecs(["docs"]))
+    assert [commit.title for commit in docs] == ["feat: docs only"]
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_iter_commit_fields():
+    _commit("feat: first\n\nwith a body\n\nReviewed-by: someone\nRefs: #1")
+    Path("docs").mkdir()
+    Path("docs/index.md").touch()
+    cmd.run("git add .")
+    git.commit("docs: document it")
+    git.commit("chore: nothing changed", args="--allow-empty")
+
+    commits = git.get_commits()
+    fields = ("rev", "parents", "title", "body", "trailers", "author", "date")
+    rows = list(git.iter_commit_fields(fields))
+    assert [row[0] for row in rows] == [commit.rev for commit in commits]
+    assert [row[1] for row in rows] == [[commits[1].rev], [commits[2].rev], []]
+    assert [(row[2], row[3]) for row in rows] == [
+        (commit.title, commit.body) for commit in commits
+    ]
+    assert rows[2][4] == [("Reviewed-by", "someone"), ("Refs", "#1")]
+    assert rows[0][4] == []
+    author = cmd.run(["git", "log", "-1", "--pretty=%an <%ae>"]).out.strip()
+    assert rows[0][5] == author
+    assert rows[0][6][:4].isdigit()
+
+    rows = list(git.iter_commit_fields(["title", "paths"], start=commits[2].rev))
+    assert rows == [
+        ("chore: nothing changed", []),
+        ("docs: document it", ["docs/index.md"]),
+    ]
+    rows = list(git.iter_commit_fields(["paths"], start=commits[2].rev))
+    assert rows == [([],), (["docs/index.md"],)]
+
+
+def test_iter_commit_fields_with_unknown_fields():
+    with pytest.raises(ValueError):
+        list(git.iter_commit_fields(["rev", "size"]))
+    with pytest.raises(ValueError):
+        list(git.iter_commit_fields(["paths", "size"]))
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+@pytest.mark.parametrize("jobs", (1, 2, 3))
+def test_iter_commits_parallel_matches_iter_commits(jobs):
+    _commit("feat: first")
+    cmd.run("git checkout -b feature")
+    for number in range(4):
+        _commit(f"fix: feature {number}\n\nwith a body")
+    cmd.run("git checkout -")
+    for number in range(5):
+        _commit(f"feat: main {number}")
+    cmd.run("git merge --no-ff --no-edit feature")
+
+    commits = list(git.iter_commits_parallel(jobs=jobs))
+    expected = list(git.iter_commits())
+    assert len(expected) == 11
+    assert [(c.rev, c.message) for c in commits] == [
+        (c.rev, c.message) for c in expected
+    ]
+    # Commits of the same second have no fixed order, the root is the oldest
+    start = next(c.rev for c in expected if c.title == "feat: first")
+    assert list(git.iter_commits_parallel(start, jobs=jobs)) == [
+        c for c in expected if c.rev != start
+    ]
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_iter_commits_parallel_can_be_closed_early():
+    for number in range(10):
+        _commit(f"fix: {number}")
+
+    commits = git.iter_commits_parallel(jobs=2)
+    assert next(commits).title == "fix: 9"
+    commits.close()
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_is_staging_clean():
+    _commit("feat: first")
+    assert git.is_staging_clean() is True
+
+    Path("new_file").touch()
+    cmd.run("git add new_file")
+    assert git.is_staging_clean() is False
+    assert git.is_staging_clean(use_fsmonitor=True) is False
+
+    git.commit("feat: second")
+    assert git.is_staging_clean(use_fsmonitor=True) is True
+    with open("new_file", "w") as f:
+        f.write("unstaged change")
+    assert git.is_staging_clean() is False
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+@pytest.mark.parametrize(
+    "version, uses_fsmonitor", (((2, 35, 1), False), ((2, 36), True), (None, False))
+)
+def test_is_staging_clean_needs_builtin_fsmonitor(mocker, version, uses_fsmonitor):
+    _commit("feat: first")
+    mocker.patch("commitizen.git.get_git_version", return_value=version)
+    run_async = mocker.spy(cmd, "run_async")
+
+    assert git.is_staging_clean(use_fsmonitor=True) is True
+    args = run_async.call_args[0]
+    assert ("core.fsmonitor=true" in args) is uses_fsmonitor
+
+
+def test_get_git_version():
+    version = git.get_git_version()
+    assert version is not None and version >= (1, 0)
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+@pytest.mark.parametrize("plumbing", (False, True))
+def test_commit_only_paths(plumbing):
+    _commit("feat: first")
+    Path("version.txt").write_text("1.0.0\n")
+    Path("other.txt").write_text("staged\n")
+    cmd.run("git add other.txt")
+    Path("pyproject.toml").write_text("[tool.commitizen]\nversion = '1.0.0'\n")
+
+    paths = ["version.txt", "pyproject.toml"]
+    if plumbing:
+        c = git.commit_paths("bump: 1.0.0\n\nbody", paths)
+    else:
+        git.add(*paths)
+        c = git.commit("bump: 1.0.0\n\nbody", paths=paths)
+
+    assert c.return_code == 0
+    head = git.get_commit("HEAD")
+    assert (head.title, head.body) == ("bump: 1.0.0", "body")
+    changed = cmd.run("git show --name-only --pretty=format: HEAD").out.split()
+    assert sorted(changed) == ["pyproject.toml", "version.txt"]
+    assert cmd.run("git status --porcelain").out == "A  other.txt\n"
+    reflog = cmd.run("git reflog -1 --pretty=%gs").out.strip()
+    assert reflog == "commit: bump: 1.0.0"
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_commit_paths_signs_like_git_commit():
+    _commit("feat: first")
+    Path("version.txt").write_text("1.0.0\n")
+    cmd.run("git config commit.gpgSign true")
+    cmd.run("git config gpg.program false")
+
+    c = git.commit_paths("bump: 1.0.0", ["version.txt"])
+
+    assert c.return_code != 0
+    assert "gpg failed to sign" in c.err
+    assert git.get_commit("HEAD").title == "feat: first"
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_commit_paths_runs_the_hooks_no_verify_keeps():
+    _commit("feat: first")
+    Path("version.txt").write_text("1.0.0\n")
+    hook = Path(".git/hooks/post-commit")
+    hook.write_text("#!/bin/sh\ntouch post-commit-ran\n")
+    hook.chmod(0o755)
+
+    c = git.commit_paths("bump: 1.0.0", ["version.txt"])
+
+    assert c.return_code == 0
+    assert git.get_commit("HEAD").title == "bump: 1.0.0"
+    assert Path("post-commit-ran").exists()
@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from commitizen import cmd, git, git_fs
+
+
+@pytest.fixture
+def tagged_project(tmp_commitizen_project):
+    git.commit("feat: initial", args="--allow-empty")
+    for tag in ("v1.0.0", "release/v1.1.0"):
+        cmd.run(f"git tag {tag}")
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_discover_from_a_subdirectory():
+    root = Path(os.getcwd()).resolve()
+    Path("src/package").mkdir(parents=True)
+
+    dirs = git_fs.discover("src/package")
+    assert dirs == git_fs.GitDirs(root, root / ".git", root / ".git")
+    assert git_fs.discover(".git") is None
+    assert git.find_git_project_root() == root
+
+
+def test_discover_outside_a_repository(tmpdir):
+    with tmpdir.as_cwd():
+        assert git_fs.discover() is None
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_discover_with_git_environment(mocker):
+    mocker.patch.dict(os.environ, {"GIT_DIR": ".git"})
+    assert git_fs.discover() is None
+
+
+@pytest.mark.usefixtures("tagged_project")
+def test_read_loose_and_packed_refs():
+    dirs = git_fs.discover()
+    head = git.get_commit("HEAD").rev
+
+    assert git_fs.read_ref(dirs, "HEAD") in (
+        "ref: refs/heads/master",
+        "ref: refs/heads/main",
+    )
+    assert git_fs.read_ref(dirs, "refs/tags/v1.0.0") == head
+    assert git_fs.list_refs(dirs, "refs/tags/") == [
+        "refs/tags/release/v1.1.0",
+        "refs/tags/v1.0.0",
+    ]
+
+    cmd.run("git pack-refs --all")
+    assert not Path(".git/refs/tags/v1.0.0").exists()
+    assert git_fs.read_ref(dirs, "refs/tags/v1.0.0") == head
+    assert git.tag_exist("release/v1.1.0") is True
+    assert git.tag_exist("v1.1.0") is False
+    assert git.tag_exist("../../HEAD") is False
+    assert len(git_fs.list_refs(dirs, "refs/tags/")) == 2
+
+
+@pytest.mark.usefixtures("tagged_project")
+def test_discover_in_a_worktree(tmpdir):
+    worktree = Path(tmpdir) / "worktree"
+    cmd.run(f"git worktree add {worktree}")
+    common_dir = Path(".git").resolve()
+
+    dirs = git_fs.discover(str(worktree))
+    assert dirs.worktree == worktree.resolve()
+    assert dirs.git_dir == common_dir / "worktrees" / "worktree"
+    assert dirs.common_dir == common_dir
+    assert git_fs.read_ref(dirs, "HEAD") == "ref: refs/heads/worktree"
+    assert git_fs.read_ref(dirs, "refs/tags/v1.0.0") is not None
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_get_latest_tag_name_without_tags(mocker):
+    git.commit("feat: initial", args="--allow-empty")
+    run = mocker.spy(cmd, "run")
+
+    assert git.get_latest_tag_name() is None
+    run.assert_not_called()
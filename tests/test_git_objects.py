@@ -0,0 +1,178 @@
+import pytest
+
+from commitizen import cmd, git, git_objects
+
+LONG_BODY = "lorem ipsum dolor sit amet\n" * 200
+
+
+def _as_tuples(commits):
+    return [(commit.rev, commit.title, commit.body) for commit in commits]
+
+
+@pytest.fixture
+def history(tmp_commitizen_project):
+    git.commit("feat: initial", args="--allow-empty")
+    cmd.run("git tag v0.1.0")
+    cmd.run("git checkout -b feature")
+    for number in range(5):
+        git.commit(
+            f"fix: feature {number}\n\n{LONG_BODY}{number}", args="--allow-empty"
+        )
+    cmd.run("git checkout -")
+    git.commit("\n\nfeat: multi\nline subject\n\n\nbody", args="--allow-empty")
+    cmd.run("git tag -a v0.2.0 -m annotated")
+    cmd.run("git merge --no-ff --no-edit feature")
+    git.commit("docs: last", args="--allow-empty")
+
+
+RANGES = (
+    (None, "HEAD"),
+    ("v0.1.0", "HEAD"),
+    ("v0.2.0", "HEAD"),
+    ("feature", "v0.2.0"),
+    (None, "v0.2.0..feature"),
+    (None, "feature.."),
+)
+
+
+@pytest.mark.usefixtures("history")
+@pytest.mark.parametrize(
+    "repack",
+    (
+        None,
+        "git gc -q",
+        "git -c repack.useDeltaBaseOffset=false repack -adfq",
+    ),
+)
+def test_iter_commits_matches_git(repack):
+    if repack:
+        cmd.run(repack)
+    for start, end in RANGES:
+        expected = _as_tuples(git.iter_commits(start, end))
+        assert _as_tuples(git_objects.iter_commits(start, end)) == expected
+    assert git_objects.get_commits() == git.get_commits()
+
+
+@pytest.mark.usefixtures("history")
+def test_iter_commits_falls_back_to_git(mocker):
+    iter_commits = mocker.spy(git, "iter_commits")
+
+    commits = git_objects.get_commits("HEAD~2", "HEAD")
+
+    assert commits == git.get_commits("HEAD~2", "HEAD")
+    iter_commits.assert_any_call("HEAD~2", "HEAD")
+
+
+@pytest.mark.usefixtures("history")
+def test_resolve():
+    repository = git_objects.Repository.open()
+    head = git.get_commit("HEAD").rev
+
+    assert repository.resolve("HEAD") == head
+    assert repository.resolve(head.upper()) == head
+    assert repository.resolve("v0.2.0") == git.get_commit("v0.2.0").rev
+    assert repository.resolve("does-not-exist") is None
+    assert repository.resolve("HEAD@{1}") is None
+    repository.close()
+
+
+@pytest.mark.usefixtures("history")
+def test_limited_walk_reads_messages_when_yielded(mocker):
+    repository = git_objects.Repository.open()
+    read_commit = mocker.spy(repository, "read_commit")
+    include = [repository.resolve("HEAD")]
+    exclude = [repository.resolve("v0.1.0")]
+
+    commits = repository.walk(include, exclude)
+    assert next(commits).title == "docs: last"
+    assert read_commit.call_count == 1
+    commits.close()
+    repository.close()
+
+
+def test_parse_commit():
+    content = (
+        b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n"
+        b"parent 0123456789012345678901234567890123456789\n"
+        b"author A <a@a> 1600000000 +0200\n"
+        b"committer C <c@c> 1600000100 +0200\n"
+        b"encoding ISO-8859-1\n"
+        b"\n"
+        b"\n"
+        b"feat: caf\xe9  \n"
+        b"second line\n"
+        b"  \n"
+        b"\n"
+        b"body\n"
+    )
+    parents, timestamp, subject, body = git_objects.parse_commit(content)
+
+    assert parents == ["0123456789012345678901234567890123456789"]
+    assert timestamp == 1600000100
+    assert subject == "feat: café second line"
+    assert body == "body\n"
+
+
+def test_apply_delta():
+    base = b"0123456789" * 10
+    # Source and target sizes, copy 10 bytes at offset 5, insert "abc"
+    delta = bytes([100, 13, 0x80 | 0x01 | 0x10, 5, 10, 3]) + b"abc"
+
+    assert git_objects.apply_delta(base, delta) == b"5678901234abc"
+
+
+def test_commit_iterator():
+    assert git_objects.commit_iterator({}) is git.iter_commits
+    assert git_objects.commit_iterator({}, lazy=True) is git.iter_lazy_commits
+    settings = {"native_object_reader": True}
+    assert git_objects.commit_iterator(settings) is git_objects.iter_commits
+    parallel = git_objects.commit_iterator(settings, jobs=4)
+    assert parallel.func is git.iter_commits_parallel
+    assert parallel.keywords == {"jobs": 4}
+
+
+@pytest.mark.usefixtures("history")
+@pytest.mark.parametrize(
+    "settings", ({}, {"native_object_reader": True}), ids=("git", "native")
+)
+@pytest.mark.parametrize("lazy", (False, True))
+def test_commit_iterator_subject_only(settings, lazy):
+    iter_commits = git_objects.commit_iterator(
+        {**settings, "subject_only": True}, lazy=lazy
+    )
+
+    commits = list(iter_commits("v0.1.0"))
+    expected = git.get_commits("v0.1.0")
+    assert [(c.rev, c.title) for c in commits] == [(c.rev, c.title) for c in expected]
+    assert all(commit.body == "" for commit in commits)
+
+
+@pytest.mark.usefixtures("history")
+def test_commit_iterator_lazy_subject_only_reads_subjects_on_use(mocker):
+    get_commit = mocker.spy(git, "get_commit")
+    iter_commits = git_objects.commit_iterator({"subject_only": True}, lazy=True)
+
+    commits = list(iter_commits("v0.1.0"))
+    assert get_commit.call_count == 0
+    assert commits[0].title == git.get_commits("v0.1.0")[0].title
+    assert get_commit.call_count == 1
+
+
+@pytest.mark.usefixtures("history")
+def test_walk_filters():
+    assert git_objects.walk_filters({}) == []
+
+    settings = {"first_parent": True}
+    first_parent = git_objects.walk_filters(settings)
+    titles = [c.title for c in git.iter_commits("v0.1.0", filters=first_parent)]
+    assert titles == [
+        "docs: last",
+        "Merge branch 'feature'",
+        "feat: multi line subject",
+    ]
+
+    settings = {"no_merges": True}
+    no_merges = git_objects.walk_filters(settings)
+    commits = list(git.iter_commits("v0.1.0", filters=no_merges))
+    assert len(commits) == 7
+    assert not any(commit.title.startswith("Merge") for commit in commits)
@@ -0,0 +1,85 @@
+import pytest
+
+from commitizen import manifest
+
+PACKAGE_JSON = b"""{
+  "name": "magictool",
+  "description": "\\"version\\": \\"0.0.1\\"",
+  "dependencies": {"version": "0.0.2", "list": [{"version": "0.0.3"}]},
+  "version" : "1.2.3",
+  "scripts": {}
+}
+"""
+
+PYPROJECT = b"""# version = "0.0.1"
+[tool.poetry]
+description = \"\"\"
+[tool.commitizen]
+version = "0.0.2"
+\"\"\"
+classifiers = [
+    "a",  # ]
+    {name = "]"},
+]
+version = "1.2.3"  # the version
+dependencies = {version = "0.0.3"}
+
+[[tool.poetry.packages]]
+version = "0.0.4"
+
+[tool."commitizen"]
+bump.version = '4.5.6'
+date = 1979-05-27 07:32:00Z
+"""
+
+CONFIG_YAML = b"""---
+description: |
+  version: 0.0.1
+name: magictool  # version: 0.0.2
+metadata:
+  tags:
+    - version: 0.0.3
+  'release': {version: 0.0.4}
+  version: "1.2.3" # quoted
+  build:
+    version: 4.5.6#rc
+"""
+
+
+@pytest.mark.parametrize(
+    "content, filename, key, value",
+    (
+        (PACKAGE_JSON, "package.json", "version", b'"1.2.3"'),
+        (PACKAGE_JSON, "package.json", "dependencies.version", b'"0.0.2"'),
+        (PYPROJECT, "pyproject.toml", "tool.poetry.version", b'"1.2.3"'),
+        (PYPROJECT, "pyproject.toml", "tool.commitizen.bump.version", b"'4.5.6'"),
+        (PYPROJECT, "pyproject.toml", "tool.commitizen.date", b"1979-05-27 07:32:00Z"),
+        (CONFIG_YAML, "config.yaml", "metadata.version", b'"1.2.3"'),
+        (CONFIG_YAML, "config.yml", "metadata.build.version", b"4.5.6#rc"),
+        (CONFIG_YAML, "config.yml", "name", b"magictool"),
+    ),
+)
+def test_find_value(content, filename, key, value):
+    start, end = manifest.find_value(content, filename, key)
+    assert content[start:end] == value
+
+
+@pytest.mark.parametrize(
+    "content, filename, key",
+    (
+        (PACKAGE_JSON, "package.json", "dependencies"),
+        (PACKAGE_JSON, "package.json", "dependencies.list.version"),
+        (PACKAGE_JSON, "package.json", "scripts.version"),
+        (PYPROJECT, "pyproject.toml", "tool.poetry.dependencies.version"),
+        (PYPROJECT, "pyproject.toml", "tool.poetry.packages.version"),
+        (PYPROJECT, "pyproject.toml", "version"),
+        (CONFIG_YAML, "config.yaml", "version"),
+        (CONFIG_YAML, "config.yaml", "metadata.tags.version"),
+        (CONFIG_YAML, "config.yaml", "metadata.release.version"),
+        (CONFIG_YAML, "config.yaml", "description"),
+        (b"version = 1.2.3", "setup.cfg", "version"),
+    ),
+)
+def test_find_value_without_value(content, filename, key):
+    with pytest.raises(ValueError):
+        manifest.find_value(content, filename, key)
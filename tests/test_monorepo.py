@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import pytest
+
+from commitizen import cmd, git, monorepo
+
+PACKAGES = {
+    "core": {"path": "packages/core", "version": "1.0.0"},
+    "cli": {
+        "path": "./packages/cli/",
+        "version": "0.1.0",
+        "tag_format": "cli-v$version",
+    },
+    "docs": {"path": "docs", "version": "2.0.0"},
+}
+
+
+def commit_file(path: str, message: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(message)
+    cmd.run(["git", "add", path])
+    git.commit(message)
+
+
+def titles(commits):
+    return [commit.title for commit in commits]
+
+
+def test_load_packages():
+    packages = monorepo.load_packages({"packages": PACKAGES})
+
+    assert [package.path for package in packages] == [
+        "packages/core",
+        "packages/cli",
+        "docs",
+    ]
+    assert [package.tag for package in packages] == [
+        "core-1.0.0",
+        "cli-v0.1.0",
+        "docs-2.0.0",
+    ]
+
+
+@pytest.mark.parametrize("key", ("path", "version"))
+def test_load_packages_without_a_required_key(key):
+    package = {k: v for k, v in PACKAGES["core"].items() if k != key}
+
+    with pytest.raises(ValueError, match=f"Package core has no {key}"):
+        monorepo.load_packages({"packages": {"core": package}})
+
+
+def test_path_index_matches_whole_directories():
+    packages = monorepo.load_packages(
+        {"packages": {**PACKAGES, "root": {"path": ".", "version": "1.0.0"}}}
+    )
+    index = monorepo._PathIndex(packages)
+
+    assert index.owners("packages/core/a.py") == {"core", "root"}
+    assert index.owners("packages/core") == {"core", "root"}
+    assert index.owners("packages/core-extra/a.py") == {"root"}
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_find_package_commits():
+    commit_file("packages/core/a.py", "feat: core before its tag")
+    commit_file("docs/index.md", "docs: docs before its tag")
+    cmd.run(["git", "tag", "core-1.0.0"])
+    commit_file("packages/cli/a.py", "fix: cli before its tag")
+    cmd.run(["git", "tag", "cli-v0.1.0"])
+    commit_file("packages/core/b.py", "fix: core")
+    commit_file("README.md", "docs: no package")
+
+    # docs has no tag yet, its whole history is read
+    packages = monorepo.load_packages({"packages": PACKAGES})
+    commits = monorepo.find_package_commits(packages, initial={"docs"})
+
+    assert titles(commits["core"]) == ["fix: core"]
+    assert titles(commits["cli"]) == []
+    assert titles(commits["docs"]) == ["docs: docs before its tag"]
+
+
+@pytest.mark.usefixtures("tmp_git_project")
+def test_find_package_commits_with_merged_branch():
+    commit_file("packages/core/a.py", "feat: first")
+    cmd.run(["git", "tag", "core-1.0.0"])
+    cmd.run(["git", "tag", "cli-v0.1.0"])
+    cmd.run(["git", "tag", "docs-2.0.0"])
+    cmd.run(["git", "checkout", "-b", "feature"])
+    commit_file("packages/cli/b.py", "feat: cli on a branch")
+    cmd.run(["git", "checkout", "-"])
+    commit_file("packages/core/c.py", "fix: core on the main branch")
+    cmd.run(["git", "merge", "--no-ff", "-m", "Merge feature", "feature"])
+
+    packages = monorepo.load_packages({"packages": PACKAGES})
+    commits = monorepo.find_package_commits(packages, initial=set())
+
+    assert titles(commits["core"]) == ["fix: core on the main branch"]
+    assert titles(commits["cli"]) == ["feat: cli on a branch"]
+    assert titles(commits["docs"]) == []
+
+
+def test_create_commit_message():
+    packages = monorepo.load_packages({"packages": PACKAGES})
+    releases = [
+        monorepo.Release(packages[0], "MINOR", monorepo.Version("1.1.0")),
+        monorepo.Release(packages[1], "PATCH", monorepo.Version("0.1.1")),
+    ]
+
+    assert monorepo.create_commit_message(releases) == (
+        "bump: core 1.1.0, cli 0.1.1\n\ncore: 1.0.0 → 1.1.0\ncli: 0.1.0 → 0.1.1"
+    )
@@ -0,0 +1,97 @@
+import pytest
+from packaging.version import Version
+
+from commitizen import cmd, git
+from commitizen.tags import TagIndex, find_current_tag, tag_format_glob
+
+TAGS = ["v0.1.0", "v1.0.0", "v1.0.0b1", "v0.9.2", "release-2", "1.5.0", "v2.0.0rc1"]
+
+
+@pytest.mark.parametrize(
+    "tag_format, tag, version",
+    (
+        ("$version", "1.0.0", "1.0.0"),
+        ("$version", "v1.0.0", None),
+        ("v$version", "v1.0.0b1", "1.0.0b1"),
+        ("v$major.$minor.$patch$prerelease", "v1.2.3", "1.2.3"),
+        ("v$major.$minor.$patch$prerelease", "v1.2.3rc1", "1.2.3rc1"),
+        ("v$major.$minor.$patch$prerelease", "v1x2.3", None),
+        ("${major}-${minor}-$major", "1-2-1", "1.2.0"),
+        ("${major}-${minor}-$major", "1-2-3", None),
+        ("$$$version", "$1.0.0", "1.0.0"),
+        ("$project-$version", "$project-1.0.0", "1.0.0"),
+    ),
+)
+def test_tag_format_regex(tag_format, tag, version):
+    assert TagIndex([], tag_format).parse(tag) == (version and Version(version))
+
+
+def test_tag_index_with_tag_format():
+    index = TagIndex(TAGS, "v$version")
+
+    assert "release-2" in index
+    assert "v3.0.0" not in index
+    assert len(index) == len(TAGS)
+    assert index.version_of("v1.0.0b1") == Version("1.0.0b1")
+    assert index.version_of("1.5.0") is None
+    assert index.latest() == "v2.0.0rc1"
+    assert index.latest_below("1.0.0") == "v1.0.0b1"
+    assert index.latest_below(Version("0.1.0")) is None
+    assert index.names() == [
+        "v2.0.0rc1",
+        "v1.0.0",
+        "v1.0.0b1",
+        "v0.9.2",
+        "v0.1.0",
+        "1.5.0",
+        "release-2",
+    ]
+
+
+def test_tag_index_without_tag_format():
+    index = TagIndex(TAGS)
+
+    assert index.latest() == "v2.0.0rc1"
+    assert index.latest_below("2.0.0rc1") == "1.5.0"
+    assert index.names()[-1] == "release-2"
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_tag_index_from_git():
+    assert len(TagIndex.from_git()) == 0
+
+    git.commit("feat: initial", args="--allow-empty")
+    for tag in ("v0.1.0", "v0.2.0", "latest"):
+        cmd.run(f"git tag {tag}")
+
+    index = TagIndex.from_git("v$version")
+    assert index.latest() == "v0.2.0"
+    assert "latest" in index
+
+
+@pytest.mark.parametrize(
+    "tag_format, glob",
+    (
+        ("$version", "*"),
+        ("v$version", "v*"),
+        ("v$major.$minor.$patch$prerelease", "v*.*.**"),
+        ("[$$]${version}?", "\\[$]*\\?"),
+    ),
+)
+def test_tag_format_glob(tag_format, glob):
+    assert tag_format_glob(tag_format) == glob
+
+
+@pytest.mark.usefixtures("tmp_commitizen_project")
+def test_find_current_tag():
+    assert find_current_tag("v$version") is None
+
+    git.commit("feat: initial", args="--allow-empty")
+    cmd.run("git tag v0.1.0")
+    git.commit("feat: second", args="--allow-empty")
+    cmd.run("git tag v0.2.0")
+    cmd.run("git tag v-nightly")
+    assert find_current_tag("v$version") == "v0.2.0"
+
+    cmd.run("git checkout -b maintenance HEAD~1")
+    assert find_current_tag("v$version") == "v0.1.0"